@@ -0,0 +1,69 @@
+# Microbenchmark for the Safety Chatbot intent classifier.
+#
+#   python bench/bench_intents.py [--intents 300] [--messages 2000]
+#
+# Times the real rule table, then a synthetic table padded out to --intents
+# intents (8 synonyms each) to check latency stays flat as the rules grow.
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from luma.intents import INTENTS, Intent, IntentClassifier  # noqa: E402
+
+SAMPLES = [
+    "I am being followed",
+    "I am locked out of my dorm",
+    "I am lost and it is dark",
+    "I feel unsafe in my current location",
+    "someone is following me and I lost my keys near the library",
+    "just walking home from the library, nothing going on",
+]
+
+
+def synthetic_intents(n, seed=0):
+    rng = random.Random(seed)
+    extra = []
+    for i in range(max(0, n - len(INTENTS))):
+        words = {f"syn{i}x{j}{rng.randint(0, 999)}": rng.choice([1, 2, 3]) for j in range(8)}
+        extra.append(Intent(f"synthetic_{i}", words, "info", "Synthetic advice"))
+    return INTENTS + extra
+
+
+def messages(n, seed=1):
+    rng = random.Random(seed)
+    return [rng.choice(SAMPLES) + " " * rng.randint(0, 3) for _ in range(n)]
+
+
+def run(label, classifier, texts, repeat=5):
+    classifier.classify_batch(texts)  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        classifier.classify_batch(texts)
+        best = min(best, time.perf_counter() - start)
+    per_msg_us = best / len(texts) * 1e6
+    print(f"{label:<28} {len(classifier.intents):>5} intents  {per_msg_us:8.2f} us/message")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--intents", type=int, default=300)
+    parser.add_argument("--messages", type=int, default=2000)
+    args = parser.parse_args()
+
+    texts = messages(args.messages)
+    start = time.perf_counter()
+    big = IntentClassifier(synthetic_intents(args.intents))
+    compile_ms = (time.perf_counter() - start) * 1e3
+
+    run("built-in rules", IntentClassifier(INTENTS), texts)
+    run("synthetic rules", big, texts)
+    print(f"compiled {len(big.intents)} intents in {compile_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
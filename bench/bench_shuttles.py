@@ -0,0 +1,61 @@
+# Microbenchmark for the live shuttle simulator.
+#
+#   python bench/bench_shuttles.py [--viewers 200] [--ticks 720]
+#
+# Replays --ticks simulator ticks over a service night; on every tick each of
+# --viewers open maps polls the feed for what changed since its last poll,
+# as the map's shuttle overlay does. Reports how many ticks were actually
+# computed, what a poll costs (should stay flat as --viewers grows) and how
+# big the deltas are next to a full snapshot.
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from luma.safety_data import load_dataset  # noqa: E402
+from luma.shuttle_sim import TICK_S, ShuttleSimulator  # noqa: E402
+from luma.timetable import BERKELEY_TZ  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shuttle simulator benchmark")
+    parser.add_argument("--viewers", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=720)  # one hour at TICK_S = 5
+    args = parser.parse_args()
+
+    clock = [datetime.now(BERKELEY_TZ).replace(hour=21, minute=0, second=0).timestamp()]
+    sim = ShuttleSimulator(load_dataset(), avl_path=os.path.join(tempfile.mkdtemp(), "none.json"),
+                           clock=lambda: clock[0])
+    computed, vehicles, changed, delta_bytes = 0, 0, 0, 0
+    last = None
+    have = [-1] * args.viewers  # version each viewer holds
+    full_bytes = len(sim.feed(-1))
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        clock[0] += TICK_S
+        for v in range(args.viewers):
+            body = sim.feed(have[v])
+            have[v] = sim.tick().version
+        delta_bytes += len(body)
+        tick = sim.tick()
+        if tick is not last:
+            computed += 1
+            vehicles += len(tick.vehicles)
+            changed += len(tick.changed_etas)
+            last = tick
+    elapsed = time.perf_counter() - start
+
+    calls = args.ticks * args.viewers
+    print(f"{args.ticks} ticks x {args.viewers} viewers: {calls} calls in {elapsed:.2f} s "
+          f"({elapsed / args.ticks * 1e3:.2f} ms per tick, {elapsed / calls * 1e6:.1f} us per poll)")
+    print(f"computed {computed} states, {vehicles / computed:.1f} shuttles on the road on average")
+    print(f"ETA deltas: {changed / computed:.1f} stops changed per tick out of {len(tick.etas)}")
+    print(f"poll size: {delta_bytes / args.ticks:.0f} bytes per tick vs {full_bytes} for a full snapshot")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# Headless load + latency benchmark for every page of app.py.
+#
+#   python bench/load_test.py --sessions 20 --rounds 5 [--out bench_output.json]
+#
+# Each simulated student is a Streamlit AppTest session; sessions are spread
+# over worker processes and take turns inside each one. Every round each
+# session walks the sidebar pages (starting a demo-mode protected walk on the
+# timer page and asking the chatbot for a plan) and we record how long each
+# rerun took. The report is JSON (p50/p99 rerun latency per page, memory per
+# session, thread occupancy) so two runs can be diffed before a deploy.
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Keep benchmark users/alerts out of the real state directory
+os.environ.setdefault("LUMA_STATE_DIR", tempfile.mkdtemp(prefix="luma-bench-"))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APP = os.path.join(ROOT, "app.py")
+PAGES = [
+    ("Homepage", "views/home.py"),
+    ("Emergency Contacts", "views/contacts.py"),
+    ("Check-in Timer", "views/checkin_timer.py"),
+    ("Berkeley Blue Lights", "views/blue_lights.py"),
+    ("Safety Chatbot", "views/chatbot.py"),
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class Session:
+    def __init__(self, index, timeout):
+        self.at = AppTest.from_file(APP, default_timeout=timeout)
+        self.at.query_params["uid"] = f"bench-{index}"
+        self.timings = defaultdict(list)
+        self.errors = []
+
+    def timed_run(self, label):
+        start = time.perf_counter()
+        self.at.run()
+        self.timings[label].append(time.perf_counter() - start)
+        if self.at.exception:
+            self.errors.append(f"{label}: {self.at.exception[0].message}")
+
+    def visit(self, title, path):
+        self.at.switch_page(path)
+        self.timed_run(title)
+        if title == "Check-in Timer" and not self.at.session_state.timer_active:
+            self.at.toggle[0].set_value(True)
+            self.at.button[0].click()
+            self.timed_run("Check-in Timer (start walk)")
+        elif title == "Safety Chatbot":
+            self.at.button[0].click()  # "Being Followed" quick option
+            self.timed_run("Safety Chatbot (plan)")
+
+
+def sample_threads(stop, samples, interval=0.05):
+    while not stop.is_set():
+        samples.append(threading.active_count())
+        time.sleep(interval)
+
+
+def drive(indices, rounds, timeout):
+    # One worker process: its sessions take turns page by page, like
+    # interleaved requests hitting one server process. A throwaway session
+    # runs first so imports and cache_resource objects (one-time process
+    # cost) aren't counted as per-session memory.
+    Session(f"warmup-{indices[0]}", timeout).at.run()
+    tracemalloc.start()
+    base_mem, _ = tracemalloc.get_traced_memory()
+    sessions = [Session(i, timeout) for i in indices]
+    for s in sessions:
+        s.timed_run("cold start")
+    session_mem, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    thread_samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=sample_threads, args=(stop, thread_samples), daemon=True)
+    sampler.start()
+    wall_start = time.perf_counter()
+    for _ in range(rounds):
+        for title, path in PAGES:
+            for s in sessions:
+                s.visit(title, path)
+    wall = time.perf_counter() - wall_start
+    stop.set()
+    sampler.join()
+
+    timings = defaultdict(list)
+    for s in sessions:
+        for label, values in s.timings.items():
+            timings[label].extend(values)
+    return {
+        "timings": dict(timings),
+        "memory_bytes": session_mem - base_mem,
+        "thread_samples": thread_samples,
+        "wall": wall,
+        "errors": [e for s in sessions for e in s.errors],
+    }
+
+
+def run_benchmark(n_sessions, rounds, timeout, procs):
+    # AppTest keeps process-global runtime state, so concurrency comes from
+    # worker processes rather than threads
+    procs = max(1, min(procs, n_sessions))
+    chunks = [list(range(i, n_sessions, procs)) for i in range(procs)]
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=procs, mp_context=mp.get_context("spawn")) as pool:
+        results = list(pool.map(drive, chunks, [rounds] * procs, [timeout] * procs))
+    wall = time.perf_counter() - wall_start
+
+    merged = defaultdict(list)
+    for result in results:
+        for label, values in result["timings"].items():
+            merged[label].extend(values)
+    samples = [n for r in results for n in r["thread_samples"]]
+    busy = sum(sum(v) for r in results for label, v in r["timings"].items() if label != "cold start")
+    worker_wall = sum(r["wall"] for r in results)
+
+    return {
+        "config": {"sessions": n_sessions, "rounds": rounds, "procs": procs, "python": platform.python_version()},
+        "wall_seconds": round(wall, 3),
+        "reruns": sum(len(v) for v in merged.values()),
+        "pages": {
+            label: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "mean_ms": round(statistics.fmean(values) * 1000, 2),
+            }
+            for label, values in merged.items()
+        },
+        "memory_per_session_kb": round(sum(r["memory_bytes"] for r in results) / n_sessions / 1024, 1),
+        "threads": {
+            "max_active_per_proc": max(samples, default=None),
+            "mean_active_per_proc": round(statistics.fmean(samples), 1) if samples else None,
+            # share of the workers' wall time spent inside script reruns
+            "rerun_occupancy": round(busy / worker_wall, 3) if worker_wall else None,
+        },
+        "errors": [e for r in results for e in r["errors"]][:20],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless load benchmark for app.py")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--procs", type=int, default=os.cpu_count() or 2, help="worker processes")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-rerun timeout (s)")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.sessions, args.rounds, args.timeout, args.procs)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
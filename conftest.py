@@ -0,0 +1 @@
+# Lets pytest import luma from the repo root
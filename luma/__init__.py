@@ -0,0 +1 @@
+# Luma helper modules (timers, map data, chatbot rules, ...) used by app.py
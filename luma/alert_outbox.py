@@ -0,0 +1,283 @@
+# Emergency alert outbox.
+#
+# When a walk expires the timer engine only drops a row into a local SQLite
+# outbox (a few hundred microseconds, never blocks a page). A dispatcher thread
+# claims due rows in batches and hands them to a small worker pool, which
+# delivers them through a pluggable transport. Failed batches are retried with
+# exponential backoff; every row keeps its delivery receipt so the alert screen
+# can show what actually happened. One alert per walk (dedupe_key is unique).
+#
+# Only a transport that handed the alert to a real recipient may mark it
+# DELIVERED: the file sink marks it RECORDED (nobody was told), and a contact
+# the transport cannot reach (no phone number) ends up SKIPPED.
+import json
+import logging
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from pathlib import Path
+
+from luma.storage import STATE_DIR
+
+log = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+DELIVERED = "delivered"  # handed to a real SMS/email gateway
+RECORDED = "recorded"    # written by a test transport only, nobody was notified
+SKIPPED = "skipped"      # the transport had no way to reach the contact
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    dedupe_key TEXT NOT NULL UNIQUE,
+    contact TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    delivered_at REAL,
+    receipt TEXT
+);
+CREATE INDEX IF NOT EXISTS alerts_due ON alerts (status, next_attempt_at);
+"""
+
+
+# --- Transports: send_batch(alerts) -> one (status, receipt) per alert, or raise.
+# status is DELIVERED, RECORDED or SKIPPED; raising retries the whole batch.
+class FileSinkTransport:
+    # Appends alerts as JSON lines; stands in for a real SMS/email gateway
+    def __init__(self, path=STATE_DIR / "alerts_sent.jsonl"):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def send_batch(self, alerts):
+        lines = "".join(json.dumps({"contact": a["contact"], **a["payload"]}) + "\n" for a in alerts)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(lines)
+        return [(RECORDED, f"file:{self.path.name}") for _ in alerts]
+
+
+class SmtpTransport:
+    # One SMTP session per batch, e.g. against `python -m aiosmtpd -n` locally.
+    # Mails <phone digits>@to_domain, the address format of email-to-SMS gateways.
+    def __init__(self, host="localhost", port=1025, sender="alerts@luma.local", to_domain="luma.local"):
+        self.host, self.port, self.sender, self.to_domain = host, port, sender, to_domain
+
+    def send_batch(self, alerts):
+        receipts = []
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            for alert in alerts:
+                digits = "".join(ch for ch in alert["payload"].get("contact_phone", "") if ch.isdigit())
+                if not digits:
+                    receipts.append((SKIPPED, "contact has no phone number"))
+                    continue
+                msg = EmailMessage()
+                msg["From"] = self.sender
+                msg["To"] = f"{digits}@{self.to_domain}"
+                msg["Subject"] = "🌙 Luma Alert: check-in window expired"
+                msg.set_content(json.dumps(alert["payload"], indent=2))
+                smtp.send_message(msg)
+                receipts.append((DELIVERED, f"smtp:{self.host}:{self.port}:{msg['To']}"))
+        return receipts
+
+
+def transport_from_env():
+    if os.environ.get("LUMA_ALERT_TRANSPORT", "file") == "smtp":
+        return SmtpTransport(
+            os.environ.get("LUMA_SMTP_HOST", "localhost"),
+            int(os.environ.get("LUMA_SMTP_PORT", "1025")),
+            to_domain=os.environ.get("LUMA_SMS_GATEWAY_DOMAIN", "luma.local"),
+        )
+    return FileSinkTransport()
+
+
+class AlertOutbox:
+    def __init__(self, path=STATE_DIR / "outbox.db", transport=None, workers=4, batch_size=50,
+                 max_attempts=6, base_delay=1.0, max_delay=300.0, clock=time.time):
+        self.path = Path(path)
+        self.transport = transport or transport_from_env()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._local = threading.local()
+        self._claim_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="luma-alert")
+        self._slots = threading.Semaphore(workers)
+        self._stopped = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = self._db()
+        db.executescript(SCHEMA)
+        # Rows caught mid-send by a crash/restart go back in the queue
+        db.execute("UPDATE alerts SET status = ? WHERE status = ?", (PENDING, SENDING))
+        db.commit()
+        self._thread = threading.Thread(target=self._run, name="luma-outbox", daemon=True)
+        self._thread.start()
+
+    # --- producer side ---
+    def enqueue(self, dedupe_key, contact, payload):
+        # False if an alert with this key is already queued or sent
+        now = self._clock()
+        db = self._db()
+        cur = db.execute(
+            "INSERT OR IGNORE INTO alerts (dedupe_key, contact, payload, status, next_attempt_at, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (dedupe_key, contact, json.dumps(payload), PENDING, now, now),
+        )
+        db.commit()
+        if cur.rowcount:
+            self._wake.set()
+        return bool(cur.rowcount)
+
+    def enqueue_walk(self, walk, trail=None):
+        # TimerEngine.on_expire listener; trail is TrailRecorder.snapshot()
+        payload = {
+            "walk_id": walk.walk_id,
+            "user_id": walk.user_id,
+            "contact_name": walk.contact,
+            "contact_phone": walk.contact_phone,
+            "status": "check-in window expired",
+            "expired_at": walk.window_start,
+        }
+        if trail:
+            payload["last_location"] = trail["last_location"]
+            payload["trail"] = trail["points"]
+        return self.enqueue(walk.walk_id, walk.contact, payload)
+
+    # --- receipts ---
+    def receipt(self, dedupe_key):
+        row = self._db().execute(
+            "SELECT status, attempts, delivered_at, receipt FROM alerts WHERE dedupe_key = ?", (dedupe_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"status": row[0], "attempts": row[1], "delivered_at": row[2], "receipt": row[3]}
+
+    def payload(self, dedupe_key):
+        # What was (or will be) sent for this alert, None if nothing was queued
+        row = self._db().execute("SELECT payload FROM alerts WHERE dedupe_key = ?", (dedupe_key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def counts(self):
+        rows = self._db().execute("SELECT status, COUNT(*) FROM alerts GROUP BY status").fetchall()
+        return dict(rows)
+
+    def drain(self, timeout=30.0):
+        # Blocks until nothing is pending/sending (benchmarks, shutdown)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            counts = self.counts()
+            if not counts.get(PENDING) and not counts.get(SENDING):
+                return True
+            self._wake.set()
+            time.sleep(0.01)
+        return False
+
+    def close(self):
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self._pool.shutdown(wait=True)
+
+    # --- dispatcher ---
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _claim_batch(self):
+        now = self._clock()
+        with self._claim_lock:
+            db = self._db()
+            rows = db.execute(
+                "SELECT id, dedupe_key, contact, payload, attempts FROM alerts "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (PENDING, now, self.batch_size),
+            ).fetchall()
+            if rows:
+                db.executemany("UPDATE alerts SET status = ? WHERE id = ?", [(SENDING, r[0]) for r in rows])
+                db.commit()
+        return [
+            {"id": r[0], "dedupe_key": r[1], "contact": r[2], "payload": json.loads(r[3]), "attempts": r[4]}
+            for r in rows
+        ]
+
+    def _next_due_in(self):
+        row = self._db().execute(
+            "SELECT MIN(next_attempt_at) FROM alerts WHERE status = ?", (PENDING,)
+        ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - self._clock())
+
+    def _run(self):
+        errors = 0
+        while not self._stopped:
+            if not self._slots.acquire(timeout=0.5):
+                continue
+            held = True
+            try:
+                # Clear before looking, so an enqueue that races us still wakes us
+                self._wake.clear()
+                batch = self._claim_batch()
+                if batch:
+                    self._pool.submit(self._deliver, batch)  # _deliver releases the slot
+                    held = errors = 0
+                    continue
+                self._slots.release()
+                held = errors = 0
+                self._wake.wait(self._next_due_in())
+            except Exception:
+                # e.g. database locked past the busy timeout: never let the
+                # dispatcher die, back off and look again
+                if held:
+                    self._slots.release()
+                errors += 1
+                log.exception("alert dispatcher failed, retrying")
+                time.sleep(min(self.max_delay, self.base_delay * 2 ** min(errors - 1, 10)))
+
+    def _deliver(self, batch):
+        try:
+            try:
+                receipts = self.transport.send_batch(batch)
+                error = None
+            except Exception as exc:  # transport down -> retry the whole batch later
+                receipts, error = None, f"{type(exc).__name__}: {exc}"
+            now = self._clock()
+            db = self._db()
+            if error is None:
+                db.executemany(
+                    "UPDATE alerts SET status = ?, attempts = attempts + 1, delivered_at = ?, receipt = ? WHERE id = ?",
+                    [(status, now, receipt, a["id"]) for a, (status, receipt) in zip(batch, receipts)],
+                )
+            else:
+                updates = []
+                for a in batch:
+                    attempts = a["attempts"] + 1
+                    status = FAILED if attempts >= self.max_attempts else PENDING
+                    delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+                    updates.append((status, attempts, now + delay, error, a["id"]))
+                db.executemany(
+                    "UPDATE alerts SET status = ?, attempts = ?, next_attempt_at = ?, receipt = ? WHERE id = ?",
+                    updates,
+                )
+            db.commit()
+        finally:
+            self._slots.release()
+            self._wake.set()
@@ -0,0 +1,169 @@
+# Static assets: the logo and the stylesheets.
+#
+# Built once per server process (resources.get_assets) from luma_logo.jpeg
+# and assets/*.css into static/, which Streamlit serves at app/static/
+# (server.enableStaticServing in .streamlit/config.toml). Every file name
+# carries a content hash, so browsers and proxies can keep it forever, and a
+# rerun only sends a one-line @import or an <img srcset> instead of the whole
+# stylesheet or a full-size JPEG.
+#
+#   python -m luma.assets build              # same build, from the command line
+#   python -m luma.assets serve --port 8767  # static/ with immutable cache headers
+#   LUMA_ASSET_URL=https://cdn.example/luma  # where pages load assets from
+#                                            # (default: app/static)
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from email.utils import formatdate
+from pathlib import Path
+
+from luma.sidecar import QuietHandler, make_server
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE_DIR = ROOT / "assets"
+STATIC_DIR = ROOT / "static"
+LOGO_PATH = ROOT / "luma_logo.jpeg"
+
+LOGO_WIDTH = 160                # CSS pixels on the homepage
+LOGO_SCALES = (1, 2, 3)         # device pixel ratios we make a variant for
+ASSET_PORT = int(os.environ.get("LUMA_ASSET_PORT", "8767"))
+CACHE_MAX_AGE = 365 * 24 * 3600
+
+_build_lock = threading.Lock()
+
+
+def fingerprint(data):
+    return hashlib.sha1(data).hexdigest()[:10]
+
+
+def minify_css(text):
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    return re.sub(r"\s*([{}:;,>])\s*", r"\1", text).strip()
+
+
+def _publish(stem, ext, data, out_dir):
+    # Writes <stem>.<hash>.<ext> (once) and drops older builds of the same asset
+    name = f"{stem}.{fingerprint(data)}.{ext}"
+    path = out_dir / name
+    if not path.exists():
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    for old in out_dir.glob(f"{stem}.*.{ext}"):
+        if old.name != name:
+            old.unlink(missing_ok=True)
+    return name
+
+
+def build_logo(src, out_dir, width=LOGO_WIDTH, scales=LOGO_SCALES):
+    # WebP variants for each pixel ratio plus a small JPEG fallback
+    from PIL import Image
+
+    with Image.open(src) as im:
+        im = im.convert("RGB")
+        variants = []
+        for scale in scales:
+            w = min(width * scale, im.width)
+            h = round(im.height * w / im.width)
+            buf = io.BytesIO()
+            im.resize((w, h), Image.LANCZOS).save(buf, "WEBP", quality=80, method=6)
+            variants.append((w, _publish(f"logo-{w}w", "webp", buf.getvalue(), out_dir)))
+        buf = io.BytesIO()
+        w = min(width, im.width)
+        im.resize((w, round(im.height * w / im.width)), Image.LANCZOS).save(buf, "JPEG", quality=82, optimize=True, progressive=True)
+        fallback = _publish(f"logo-{w}w", "jpeg", buf.getvalue(), out_dir)
+    return {"src": fallback, "srcset": variants, "width": width}
+
+
+def build(out_dir=STATIC_DIR, source_dir=SOURCE_DIR, logo=LOGO_PATH):
+    # -> manifest {"css": {name: file}, "logo": {...} or None}. Skips the
+    # work when static/ already holds a build of exactly these sources.
+    sources = sorted(source_dir.glob("*.css")) + ([logo] if logo.exists() else [])
+    key = fingerprint(repr((LOGO_WIDTH, LOGO_SCALES)).encode() + b"".join(p.read_bytes() for p in sources))
+    manifest_path = out_dir / "manifest.json"
+    with _build_lock:
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("key") == key:
+                return manifest
+        except (FileNotFoundError, ValueError):
+            pass
+        out_dir.mkdir(parents=True, exist_ok=True)
+        css = {
+            path.stem: _publish(path.stem, "css", minify_css(path.read_text(encoding="utf-8")).encode(), out_dir)
+            for path in sorted(source_dir.glob("*.css"))
+        }
+        manifest = {"key": key, "css": css, "logo": build_logo(logo, out_dir) if logo.exists() else None}
+        tmp = manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, manifest_path)
+        return manifest
+
+
+def asset_url(name):
+    base = os.environ.get("LUMA_ASSET_URL", "app/static").rstrip("/")
+    return f"{base}/{name}"
+
+
+def stylesheet_tag(manifest, name):
+    # A one-line <style> that pulls in the cached stylesheet (inline when
+    # there is no build, e.g. on a read-only checkout)
+    if not manifest:
+        return f"<style>{minify_css((SOURCE_DIR / f'{name}.css').read_text(encoding='utf-8'))}</style>"
+    return f'<style>@import url("{asset_url(manifest["css"][name])}");</style>'
+
+
+def logo_tag(manifest, alt="Luma"):
+    logo = manifest["logo"]
+    srcset = ", ".join(f"{asset_url(name)} {w}w" for w, name in logo["srcset"])
+    return (
+        f'<img class="luma-logo" src="{asset_url(logo["src"])}" srcset="{srcset}" '
+        f'sizes="{logo["width"]}px" width="{logo["width"]}" alt="{alt}">'
+    )
+
+
+# --- standalone server with long-lived cache headers (behind a proxy/CDN) ---
+class AssetHandler(QuietHandler):
+    types = {".css": "text/css", ".webp": "image/webp", ".jpeg": "image/jpeg", ".png": "image/png"}
+    # Only fingerprinted names: anything else could change under the same URL
+    name_re = re.compile(r"^/([\w.-]+\.[0-9a-f]{10}\.(css|webp|jpeg|png))$")
+
+    def do_GET(self):
+        match = self.name_re.match(self.path.split("?", 1)[0])
+        path = self.server.root / match.group(1) if match else None
+        if path is None or not path.is_file():
+            return self.reply(404, headers=[("Cache-Control", "no-store")])
+        etag = '"' + path.name.rsplit(".", 2)[1] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self.reply(304, headers=[("ETag", etag)])
+        self.reply(200, path.read_bytes(), self.types[path.suffix], headers=[
+            ("ETag", etag),
+            ("Last-Modified", formatdate(path.stat().st_mtime, usegmt=True)),
+            ("Cache-Control", f"public, max-age={CACHE_MAX_AGE}, immutable"),
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Luma static assets")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="resize the logo and fingerprint the stylesheets into static/")
+    srv = sub.add_parser("serve", help="serve static/ with immutable cache headers")
+    srv.add_argument("--port", type=int, default=ASSET_PORT)
+    args = parser.parse_args()
+
+    manifest = build()
+    if args.cmd == "build":
+        for name in [*manifest["css"].values(), *(n for _, n in (manifest["logo"] or {}).get("srcset", []))]:
+            print(f"{STATIC_DIR / name}  {(STATIC_DIR / name).stat().st_size} bytes")
+    else:
+        print(f"serving {STATIC_DIR} on http://localhost:{args.port}/ (set LUMA_ASSET_URL to this)")
+        make_server(AssetHandler, args.port, root=STATIC_DIR).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Per-session emergency contact directory.
+#
+# Contacts are keyed by their store id (dicts keep insertion order), so
+# delete, lookup and "who is primary" are O(1) no matter how long the list
+# is, and widget keys stay stable when a contact above is removed. The
+# primary contact is still persisted by name (users.primary_contact).
+UCPD_NAME = "Campus Police (UCPD)"
+UCPD_PHONE = "510-642-3333"
+
+
+class ContactIndex:
+    def __init__(self, contacts, primary_name=UCPD_NAME):
+        self._by_id = {c["id"]: c for c in contacts}
+        self.primary_id = next((c["id"] for c in contacts if c["name"] == primary_name), None)
+        if self.primary_id is None:
+            self.primary_id = self.fallback_id()
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(list(self._by_id.values()))
+
+    def __contains__(self, contact_id):
+        return contact_id in self._by_id
+
+    def ids(self):
+        return list(self._by_id)
+
+    def get(self, contact_id):
+        return self._by_id.get(contact_id)
+
+    @property
+    def primary(self):
+        return self._by_id.get(self.primary_id)
+
+    @property
+    def primary_name(self):
+        primary = self.primary
+        return primary["name"] if primary else UCPD_NAME
+
+    def fallback_id(self):
+        # UCPD when it's in the list, else whoever was added first
+        ucpd = next((cid for cid, c in self._by_id.items() if c["name"] == UCPD_NAME), None)
+        return ucpd or next(iter(self._by_id), None)
+
+    def add(self, contact):
+        self._by_id[contact["id"]] = contact
+        if self.primary_id is None:
+            self.primary_id = contact["id"]
+        return contact
+
+    def remove(self, contact_id):
+        # Returns the removed contact; a removed primary falls back to UCPD
+        contact = self._by_id.pop(contact_id, None)
+        if contact is not None and contact_id == self.primary_id:
+            self.primary_id = self.fallback_id()
+        return contact
+
+    def set_primary(self, contact_id):
+        if contact_id not in self._by_id:
+            return False
+        self.primary_id = contact_id
+        return True
+
+    def is_protected(self, contact_id):
+        # The campus police entry can't be deleted
+        contact = self._by_id.get(contact_id)
+        return contact is not None and contact["name"] == UCPD_NAME
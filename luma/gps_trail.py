@@ -0,0 +1,221 @@
+# Location trail for protected walks.
+#
+# The phone's browser posts geolocation fixes straight to a small ingest
+# endpoint (no Streamlit rerun per ping). Each walk keeps a fixed-size ring
+# buffer: a fix is only kept once the walker has moved MIN_STEP_M or
+# MAX_GAP_S has passed, so standing still costs nothing and a long walk never
+# grows past TRAIL_CAPACITY points. Kept points are flushed to SQLite in one
+# batch every couple of seconds; when a walk expires the alert carries a
+# Douglas-Peucker simplified copy of the trail.
+#
+#   LUMA_GPS_PORT=8766   port of the ingest endpoint
+#   LUMA_GPS_URL=...     public URL of that endpoint, when it sits behind a proxy
+#                        (see luma.sidecar; Codespaces is detected on its own)
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+
+from luma import metrics
+from luma.sidecar import QuietHandler, forwarded_url, start_server
+from luma.spatial_index import METERS_PER_DEG_LAT
+
+TRAIL_CAPACITY = 256     # points kept in memory per walk
+MIN_STEP_M = 10          # closer than this to the last kept point -> skip
+MAX_GAP_S = 30           # ...unless this long has passed (shows we still hear the phone)
+MAX_ACCURACY_M = 150     # fixes worse than this are ignored
+FLUSH_INTERVAL = 2.0
+ALERT_EPSILON_M = 15     # Douglas-Peucker tolerance for the alert copy
+
+GPS_PORT = int(os.environ.get("LUMA_GPS_PORT", "8766"))
+
+log = logging.getLogger(__name__)
+
+
+def _xy(lat, lon, lat0):
+    # Local equirectangular projection in meters, plenty for a campus walk
+    return lon * METERS_PER_DEG_LAT * math.cos(math.radians(lat0)), lat * METERS_PER_DEG_LAT
+
+
+def step_m(a, b):
+    # Distance between two (t, lat, lon, ...) points
+    ax, ay = _xy(a[1], a[2], a[1])
+    bx, by = _xy(b[1], b[2], a[1])
+    return math.hypot(bx - ax, by - ay)
+
+
+def simplify(points, epsilon_m):
+    # Douglas-Peucker on (t, lat, lon, ...) points; keeps the first and last
+    if len(points) < 3:
+        return list(points)
+    lat0 = points[0][1]
+    xy = [_xy(p[1], p[2], lat0) for p in points]
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        (x0, y0), (x1, y1) = xy[lo], xy[hi]
+        dx, dy = x1 - x0, y1 - y0
+        norm = math.hypot(dx, dy)
+        worst, worst_i = -1.0, None
+        for i in range(lo + 1, hi):
+            x, y = xy[i]
+            if norm:
+                d = abs(dy * (x - x0) - dx * (y - y0)) / norm
+            else:
+                d = math.hypot(x - x0, y - y0)
+            if d > worst:
+                worst, worst_i = d, i
+        if worst_i is not None and worst > epsilon_m:
+            keep[worst_i] = True
+            stack.append((lo, worst_i))
+            stack.append((worst_i, hi))
+    return [p for p, k in zip(points, keep) if k]
+
+
+class Trail:
+    __slots__ = ("walk_id", "points", "pending", "last", "received")
+
+    def __init__(self, walk_id, capacity):
+        self.walk_id = walk_id
+        self.points = deque(maxlen=capacity)   # kept (t, lat, lon, accuracy)
+        self.pending = deque(maxlen=capacity)  # kept but not flushed yet
+        self.last = None                       # newest fix, kept or not
+        self.received = 0
+
+
+class TrailRecorder:
+    def __init__(self, store, capacity=TRAIL_CAPACITY, min_step_m=MIN_STEP_M, max_gap_s=MAX_GAP_S,
+                 flush_interval=FLUSH_INTERVAL):
+        self.store = store
+        self.capacity = capacity
+        self.min_step_m = min_step_m
+        self.max_gap_s = max_gap_s
+        self.flush_interval = flush_interval
+        self._trails = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="luma-gps-flush", daemon=True)
+        self._thread.start()
+
+    # --- walk lifecycle ---
+    def start(self, walk_id):
+        with self._lock:
+            self._trails.setdefault(walk_id, Trail(walk_id, self.capacity))
+
+    def stop(self, walk_id):
+        # Flushes what is left and forgets the walk
+        self.flush()
+        with self._lock:
+            self._trails.pop(walk_id, None)
+
+    def is_recording(self, walk_id):
+        return walk_id in self._trails
+
+    # --- ingestion (hot path) ---
+    def add(self, walk_id, lat, lon, t=None, accuracy=None):
+        # False if the walk isn't being recorded or the fix is unusable
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return False
+        accuracy = None if accuracy is None else float(accuracy)
+        if accuracy is not None and accuracy > MAX_ACCURACY_M:
+            metrics.GPS_PINGS.inc(result="inaccurate")
+            return False
+        point = (time.time() if t is None else float(t), lat, lon, accuracy)
+        with self._lock:
+            trail = self._trails.get(walk_id)
+            if trail is None:
+                return False
+            trail.received += 1
+            trail.last = point
+            prev = trail.points[-1] if trail.points else None
+            keep = prev is None or point[0] - prev[0] >= self.max_gap_s or step_m(prev, point) >= self.min_step_m
+            if keep:
+                trail.points.append(point)
+                trail.pending.append(point)
+        metrics.GPS_PINGS.inc(result="kept" if keep else "skipped")
+        return True
+
+    # --- readers ---
+    def snapshot(self, walk_id, epsilon_m=ALERT_EPSILON_M):
+        # Compact trail for an alert payload, or None when nothing was recorded
+        with self._lock:
+            trail = self._trails.get(walk_id)
+            if trail is None or trail.last is None:
+                return None
+            points = list(trail.points)
+            last = trail.last
+            received = trail.received
+        if points[-1] is not last:
+            points.append(last)
+        return {
+            "points": [[round(t, 1), round(lat, 6), round(lon, 6)] for t, lat, lon, _ in simplify(points, epsilon_m)],
+            "last_location": {"lat": last[1], "lon": last[2], "t": last[0], "accuracy": last[3]},
+            "pings": received,
+        }
+
+    def stats(self, walk_id):
+        with self._lock:
+            trail = self._trails.get(walk_id)
+            if trail is None:
+                return None
+            return {"pings": trail.received, "kept": len(trail.points), "last": trail.last}
+
+    # --- batched flush to storage ---
+    def flush(self):
+        rows = []
+        with self._lock:
+            for trail in self._trails.values():
+                rows.extend((trail.walk_id, *point) for point in trail.pending)
+                trail.pending.clear()
+        if rows:
+            self.store.add_trail_points(rows)
+        return len(rows)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                log.exception("trail flush failed")
+
+
+# --- ingest endpoint: POST /walks/<walk_id>/pings ---
+class PingHandler(QuietHandler):
+    # Body: {"lat": .., "lon": .., "t": .., "accuracy": ..} or a list of those
+    cors_methods = "POST, OPTIONS"
+    path_re = re.compile(r"^/walks/([0-9a-f]{32})/pings$")
+    max_body = 64 * 1024
+
+    def do_POST(self):
+        recorder = self.server.recorder
+        match = self.path_re.match(self.path.split("?", 1)[0])
+        if not match or not recorder.is_recording(match.group(1)):
+            return self.reply_json(404, {"error": "no such walk"})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.max_body:
+            return self.reply_json(413, {"error": "too large"})
+        try:
+            body = json.loads(self.rfile.read(length) or b"null")
+            pings = body if isinstance(body, list) else [body]
+            accepted = sum(
+                recorder.add(match.group(1), float(p["lat"]), float(p["lon"]), p.get("t"), p.get("accuracy"))
+                for p in pings
+            )
+        except (ValueError, TypeError, KeyError):
+            return self.reply_json(400, {"error": "bad ping"})
+        self.reply_json(200, {"accepted": accepted})
+
+
+def start_ingest_server(recorder, host="0.0.0.0", port=GPS_PORT):
+    return start_server(PingHandler, port, "luma-gps", host, recorder=recorder)
+
+
+def ingest_url():
+    # Base URL the browser posts to; "" means same host as the app, GPS_PORT
+    return os.environ.get("LUMA_GPS_URL") or forwarded_url(GPS_PORT) or ""
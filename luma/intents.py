@@ -0,0 +1,139 @@
+# Intent rules for the Safety Chatbot.
+#
+# Every keyword/phrase of every intent is compiled into ONE regex built from a
+# character trie of the phrases (a hand-rolled automaton: shared prefixes are
+# only tried once, longer phrases win), so a message is lowercased (curly
+# apostrophes made straight) and scanned once and the cost barely moves as we
+# add intents or synonyms. Each hit adds its weight to its intent; all
+# matching intents come back ranked, ties going to the intent listed first
+# (the order the old if/elif chain used).
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from luma.contacts import UCPD_NAME, UCPD_PHONE
+
+# iOS "smart punctuation" types ’ for ' by default
+_QUOTES = str.maketrans({"\u2019": "'", "\u2018": "'"})
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    keywords: dict          # phrase -> weight
+    level: str              # "warning" or "info" (st.warning / st.info)
+    advice: str
+    button: tuple = None    # (label, href); may use {primary_contact} / {primary_phone}
+    show_nearest: bool = False
+
+    def link(self, primary):
+        # (label, href) of the button for the user's primary contact
+        # (ContactIndex.primary: {"name", "phone", ...}; None -> UCPD)
+        name, phone = (primary["name"], primary["phone"]) if primary else (UCPD_NAME, UCPD_PHONE)
+        fields = {"primary_contact": name, "primary_phone": "".join(ch for ch in phone if ch.isdigit() or ch == "+")}
+        label, href = self.button
+        return label.format(**fields), href.format(**fields)
+
+
+class IntentScore(NamedTuple):
+    intent: Intent
+    score: float
+    hits: tuple
+
+
+INTENTS = [
+    Intent(
+        "followed",
+        {"followed": 3, "following me": 3, "follows me": 3, "stalking": 3, "stalked": 3, "someone behind me": 2},
+        "warning",
+        "⚠️ **Immediate Action:** Go to a populated area (a store, restaurant) or a Blue Light phone. Do not go home. Call UCPD.",
+        ("👮 Call UCPD Now", "tel:5106423333"),
+    ),
+    Intent(
+        "lost",
+        {"lost": 2, "dark": 2, "can't find": 1, "cant find": 1, "don't know where": 2, "dont know where": 2, "no lights": 1},
+        "info",
+        "🗺️ **Action Plan:** Open the 'Berkeley Blue Lights' page to find the nearest stop for the Night Safety Shuttle[cite: 184].",
+        show_nearest=True,
+    ),
+    Intent(
+        "unsafe",
+        {"unsafe": 1.5, "scared": 1.5, "afraid": 1.5, "uncomfortable": 1, "nervous": 1, "creepy": 1},
+        "warning",
+        "⚠️ **Action Plan:** Trust your gut. Move to a bright, crowded area. Request a Bearwalk companion.",
+        ("🚶 Request Bearwalk", "tel:5106429255"),
+    ),
+    Intent(
+        "locked_out",
+        {"locked out": 1, "locked in": 1, "lost my key": 2, "lost my keys": 2, "can't get in": 1, "cant get in": 1},
+        "info",
+        "🔑 **Action Plan:** Call your resident advisor or UCPD non-emergency.",
+        ("📞 Call UCPD Non-Emergency", "tel:5106426760"),
+    ),
+]
+
+# Used when nothing matches
+FALLBACK = Intent(
+    "general",
+    {},
+    "info",
+    "💡 **Action Plan:** Stay calm. Find a brightly lit area. Utilize your emergency contacts if necessary.",
+    ("📞 Call {primary_contact}", "tel:{primary_phone}"),
+)
+
+
+def _trie_pattern(node):
+    # {"l": {"o": {"s": {"t": {"": True, " ": ...}}}}} -> "l(?:o(?:s(?:t(?: ...)?)))"
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # Greedy "?" keeps going when a longer phrase continues past this one
+    return f"(?:{body})?" if "" in node else body
+
+
+class IntentClassifier:
+    def __init__(self, intents):
+        self.intents = list(intents)
+        self._rank = {intent.name: i for i, intent in enumerate(self.intents)}
+        # phrase -> [(intent, weight), ...] (a phrase may feed several intents)
+        self._phrases = defaultdict(list)
+        for intent in self.intents:
+            for phrase, weight in intent.keywords.items():
+                self._phrases[phrase.lower().translate(_QUOTES)].append((intent, weight))
+        trie = {}
+        for phrase in self._phrases:
+            node = trie
+            for ch in phrase:
+                node = node.setdefault(ch, {})
+            node[""] = True
+        # Leading word boundary only, so "dark" still matches "darkness"
+        self._pattern = re.compile(rf"\b(?:{_trie_pattern(trie)})") if self._phrases else None
+
+    def classify(self, text):
+        # Ranked [IntentScore, ...] for every intent the text mentions
+        if not text or self._pattern is None:
+            return []
+        scores = defaultdict(float)
+        hits = defaultdict(list)
+        for found in self._pattern.finditer(text.lower().translate(_QUOTES)):
+            phrase = found.group(0)
+            for intent, weight in self._phrases[phrase]:
+                scores[intent.name] += weight
+                hits[intent.name].append(phrase)
+        ranked = sorted(scores, key=lambda name: (-scores[name], self._rank[name]))
+        return [IntentScore(self.intents[self._rank[name]], scores[name], tuple(hits[name])) for name in ranked]
+
+    def classify_batch(self, texts):
+        return [self.classify(text) for text in texts]
+
+    def best(self, text):
+        # Top intent, or FALLBACK when nothing matched
+        ranked = self.classify(text)
+        return ranked[0].intent if ranked else FALLBACK
+
+
+CLASSIFIER = IntentClassifier(INTENTS)
+classify = CLASSIFIER.classify
+classify_batch = CLASSIFIER.classify_batch
@@ -0,0 +1,276 @@
+# Lightweight in-process metrics for the running app.
+#
+# Counters, gauges and histograms live in one registry and are rendered in the
+# Prometheus text format. Nothing is exported unless asked for:
+#
+#   LUMA_METRICS_PORT=9464   serve http://localhost:9464/metrics
+#   LUMA_METRICS_FILE=path   rewrite the same text to a file every 15 s
+#   LUMA_PROFILE_SLOW_MS=250 sample page reruns and dump the stacks of any
+#                            rerun slower than this (see RerunProfiler)
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from functools import wraps
+
+from luma.sidecar import QuietHandler, start_server
+from luma.storage import STATE_DIR
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels))
+    return "{" + inner + "}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{_label_str(labels)} {value:g}" for name, labels, value in self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        super().__init__(name, help_text)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text):
+        super().__init__(name, help_text)
+        self._values = {}
+        self._functions = {}
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+    def set_function(self, fn, **labels):
+        # Value is read from fn() at scrape time (e.g. engine.active_count)
+        with self._lock:
+            self._functions[tuple(sorted(labels.items()))] = fn
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, fn in functions.items():
+            try:
+                values[key] = fn()
+            except Exception:
+                continue
+        return [(self.name, key, value) for key, value in values.items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            i = bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        out = []
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in series.items():
+            running = 0
+            for bound, n in zip(self.buckets, values):
+                running += n
+                out.append((f"{self.name}_bucket", key + (("le", f"{bound:g}"),), running))
+            out.append((f"{self.name}_bucket", key + (("le", "+Inf"),), values[-1]))
+            out.append((f"{self.name}_sum", key, values[-2]))
+            out.append((f"{self.name}_count", key, values[-1]))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+    def counter(self, name, help_text=""):
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name, help_text=""):
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- the app's hot-path metrics ---
+PAGE_RERUN = REGISTRY.histogram("luma_page_rerun_seconds", "Time to run one page script")
+MAP_BUILD = REGISTRY.histogram("luma_map_build_seconds", "Time to build the Blue Lights folium map")
+MAP_RENDER = REGISTRY.histogram("luma_map_render_seconds", "Time spent in st_folium serialization")
+ACTIVE_WALKS = REGISTRY.gauge("luma_active_walks", "Protected walks currently running")
+EMERGENCIES = REGISTRY.counter("luma_emergencies_triggered_total", "Walks whose check-in window expired")
+CHATBOT_INTENTS = REGISTRY.counter("luma_chatbot_intents_total", "Chatbot answers by matched intent")
+ALERTS = REGISTRY.gauge("luma_alerts", "Alert outbox rows by status")
+GPS_PINGS = REGISTRY.counter("luma_gps_pings_total", "Location pings by outcome (kept/skipped/inaccurate)")
+
+
+def timed(histogram, **labels):
+    # Decorator form of histogram.time()
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# --- exporters ---
+class _MetricsHandler(QuietHandler):
+    cors = False  # scraped by Prometheus, not fetched by pages
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            return self.reply(404)
+        self.reply(200, REGISTRY.render().encode(), "text/plain; version=0.0.4; charset=utf-8")
+
+
+def start_exporters():
+    # Starts whatever LUMA_METRICS_PORT / LUMA_METRICS_FILE ask for
+    started = []
+    port = os.environ.get("LUMA_METRICS_PORT")
+    if port:
+        server = start_server(_MetricsHandler, int(port), "luma-metrics")
+        if server:
+            started.append(server)
+    path = os.environ.get("LUMA_METRICS_FILE")
+    if path:
+        def write_loop():
+            while True:
+                tmp = f"{path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as fh:
+                    fh.write(REGISTRY.render())
+                os.replace(tmp, path)
+                time.sleep(15)
+        thread = threading.Thread(target=write_loop, name="luma-metrics-file", daemon=True)
+        thread.start()
+        started.append(thread)
+    return started
+
+
+# --- opt-in sampling profiler for slow reruns ---
+class RerunProfiler:
+    # Samples the calling thread's stack every `interval` seconds while a page
+    # runs. If the rerun took longer than threshold_ms, the collapsed stacks
+    # (flamegraph.pl / speedscope format) go to .luma/profiles/.
+    def __init__(self, threshold_ms, interval=0.005, out_dir=STATE_DIR / "profiles"):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.out_dir = out_dir
+
+    @classmethod
+    def from_env(cls):
+        threshold = os.environ.get("LUMA_PROFILE_SLOW_MS")
+        return cls(float(threshold)) if threshold else None
+
+    @contextmanager
+    def capture(self, label):
+        target = threading.get_ident()
+        stacks = _Tally()
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.interval):
+                frame = sys._current_frames().get(target)
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stacks[";".join(reversed(names))] += 1
+
+        sampler = threading.Thread(target=sample, name="luma-profiler", daemon=True)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            yield
+        finally:
+            done.set()
+            sampler.join()
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.threshold and stacks:
+                self._dump(label, elapsed, stacks)
+
+    def _dump(self, label, elapsed, stacks):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        safe = "".join(ch if ch.isalnum() else "_" for ch in label)
+        path = self.out_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{safe}-{elapsed * 1000:.0f}ms.txt"
+        path.write_text("".join(f"{stack} {n}\n" for stack, n in stacks.most_common()), encoding="utf-8")
@@ -0,0 +1,223 @@
+# Process-wide resources shared by every page and session (st.cache_resource).
+#
+# Page-specific modules are imported inside the getters, so e.g. folium is
+# only loaded the first time someone opens the Blue Lights page.
+import logging
+import os
+from urllib.parse import urlsplit
+
+import streamlit as st
+
+from luma import metrics
+from luma.safety_data import load_dataset
+from luma.storage import SafetyStore
+
+log = logging.getLogger(__name__)
+
+
+# Contacts and walk state live in SQLite so they survive refreshes and are
+# shared across server replicas; session_state is the per-session cache
+@st.cache_resource
+def get_store():
+    return SafetyStore()
+
+
+def save_walk_state():
+    get_store().save_user(
+        st.session_state.user_id,
+        timer_active=st.session_state.timer_active,
+        emergency_triggered=st.session_state.emergency_triggered,
+        walk_id=st.session_state.walk_id,
+    )
+
+
+# One alert outbox and one timer engine per server process, shared by every
+# session. Expired walks go straight into the outbox from the timer thread.
+@st.cache_resource
+def get_alert_outbox():
+    from luma.alert_outbox import DELIVERED, FAILED, PENDING, RECORDED, SENDING, SKIPPED, AlertOutbox
+    outbox = AlertOutbox()
+    for status in (PENDING, SENDING, DELIVERED, RECORDED, SKIPPED, FAILED):
+        metrics.ALERTS.set_function(lambda status=status: outbox.counts().get(status, 0), status=status)
+    return outbox
+
+
+# Location pings for running walks, posted by the browser to the ingest endpoint
+@st.cache_resource
+def get_trail_recorder():
+    from luma.gps_trail import TrailRecorder, start_ingest_server
+    recorder = TrailRecorder(get_store())
+    start_ingest_server(recorder)
+    return recorder
+
+
+# Walks are written through to the store, so a restart or another replica
+# re-arms them instead of forgetting them.
+@st.cache_resource
+def get_timer_engine():
+    from luma.timer_engine import TimerEngine, Walk
+    store = get_store()
+    engine = TimerEngine(loader=lambda walk_id: stored_walk(store, walk_id))
+    outbox, recorder = get_alert_outbox(), get_trail_recorder()
+    engine.on_change(store.save_walk)
+    engine.on_expire(lambda walk: outbox.enqueue_walk(walk, recorder.snapshot(walk.walk_id)))
+    engine.on_expire(lambda walk: metrics.EMERGENCIES.inc())
+    engine.on_drop(store.end_walk)
+    engine.on_drop(recorder.stop)  # abandoned/expired walks free their trail too
+    metrics.ACTIVE_WALKS.set_function(engine.active_count)
+    for row in store.load_walks():
+        engine.resume(Walk(**row))  # overdue ones expire into the outbox right away
+    return engine
+
+
+def stored_walk(store, walk_id):
+    from luma.timer_engine import Walk
+    row = store.load_walk(walk_id)
+    return Walk(**row) if row else None
+
+
+def get_walk(walk_id):
+    # The running walk, re-armed from the store if this process doesn't have
+    # it (restart, or the session landed on another replica). None only once
+    # the walk has really ended.
+    engine = get_timer_engine()
+    walk = engine.get(walk_id)
+    if walk is None and walk_id:
+        saved = stored_walk(get_store(), walk_id)
+        if saved is not None:
+            engine.resume(saved)
+            walk = engine.get(walk_id)
+    return walk
+
+
+# Resized logo + fingerprinted stylesheets in static/, built once per process
+@st.cache_resource
+def get_assets():
+    from luma.assets import build
+    try:
+        return build()
+    except OSError as exc:  # read-only checkout: pages fall back to inline CSS
+        log.warning("asset build failed, serving inline CSS: %s", exc)
+        return None
+
+
+# Metrics endpoint / file sink, only when LUMA_METRICS_PORT or _FILE is set
+@st.cache_resource
+def get_metrics_exporters():
+    return metrics.start_exporters()
+
+
+# Everything built from the safety dataset is shared by all sessions and keyed
+# on the dataset version, so editing the data file rebuilds them exactly once
+@st.cache_resource(max_entries=4)
+@metrics.timed(metrics.MAP_BUILD)
+def get_blue_lights_map(data_version, _data, tiles_url=None, zoom_range=None):
+    from luma.safety_map import build_map
+    return build_map(_data, tiles_url, zoom_range)
+
+
+# Local campus tiles, served from the MBTiles cache once a prefetch has completed
+@st.cache_resource
+def get_tile_server():
+    from luma.tile_cache import start_background_server
+    return start_background_server()
+
+
+# Zoom levels of the last completed prefetch, re-read when the file changes
+@st.cache_resource(max_entries=1)
+def get_tile_zoom_range(mbtiles_mtime):
+    from luma.tile_cache import prefetched_zooms
+    return prefetched_zooms()
+
+
+def map_tiles():
+    # (tile URL template, (min_zoom, max_zoom)) for this browser; (None, None)
+    # falls back to CartoDB, e.g. while a prefetch is unfinished
+    from luma.tile_cache import MBTILES_PATH, local_tile_url
+    zooms = get_tile_zoom_range(MBTILES_PATH.stat().st_mtime_ns) if MBTILES_PATH.exists() else None
+    url = local_tile_url(urlsplit(st.context.url or "").hostname or "localhost", prefetched=zooms is not None)
+    if url is None:
+        return None, None
+    if not os.environ.get("LUMA_TILE_URL"):
+        get_tile_server()
+    return url, zooms
+
+
+@st.cache_resource(max_entries=2)
+def get_safety_index(data_version, _data):
+    from luma.spatial_index import SpatialIndex, safety_points
+    return SpatialIndex(safety_points(_data))
+
+
+@st.cache_resource(max_entries=2)
+def get_timetable(data_version, _data):
+    from luma.timetable import build_timetable
+    return build_timetable(_data)
+
+
+# Safest-route graph, built once per dataset / walkway file version
+@st.cache_resource(max_entries=2)
+def get_route_planner(data_version, _data, walkways_version=None):
+    from luma.routes import build_route_planner
+    return build_route_planner(_data)
+
+
+# One shuttle simulator per dataset: it advances once per tick however many
+# sessions are watching the map
+@st.cache_resource(max_entries=2)
+def get_shuttle_sim(data_version, _data):
+    from luma.shuttle_sim import build_shuttle_simulator
+    return build_shuttle_simulator(_data)
+
+
+# Endpoint the maps' shuttle overlay polls for position/ETA deltas
+@st.cache_resource
+def get_shuttle_feed_server():
+    from luma.shuttle_sim import start_feed_server
+    return start_feed_server()
+
+
+def shuttle_simulator(data):
+    # The current dataset's simulator, also published on the feed endpoint
+    simulator = get_shuttle_sim(data.version, data)
+    server = get_shuttle_feed_server()
+    if server is not None:
+        server.simulator = simulator
+    return simulator
+
+
+def share_location(walk_id):
+    # Invisible component: watches the phone's position and posts the fixes to
+    # the ingest endpoint every few seconds, without rerunning the page
+    from luma.gps_trail import GPS_PORT, ingest_url
+    if get_walk(walk_id) is None:
+        return  # walk already ended: nothing is listening for its pings
+    get_trail_recorder().start(walk_id)
+    st.iframe(f"""
+        <script>
+        const loc = window.parent.location;
+        const base = "{ingest_url()}" || `${{loc.protocol}}//${{loc.hostname}}:{GPS_PORT}`;
+        const endpoint = `${{base}}/walks/{walk_id}/pings`;
+        let queue = [];
+        navigator.geolocation.watchPosition(pos => queue.push({{
+            lat: pos.coords.latitude, lon: pos.coords.longitude,
+            accuracy: pos.coords.accuracy, t: pos.timestamp / 1000,
+        }}), () => {{}}, {{enableHighAccuracy: true, maximumAge: 5000}});
+        setInterval(() => {{
+            if (!queue.length) return;
+            const batch = queue;
+            queue = [];
+            fetch(endpoint, {{method: "POST", headers: {{"Content-Type": "application/json"}}, body: JSON.stringify(batch)}})
+                .catch(() => {{ queue = batch.concat(queue).slice(-50); }});
+        }}, 3000);
+        </script>
+    """, height="content")
+
+
+def show_nearest_safe_points(lat, lon):
+    data = load_dataset()
+    index = get_safety_index(data.version, data)
+    st.markdown("#### 🧭 Closest Safe Points")
+    for kind, label in [("blue_light", "🔵 Blue Light Phone"), ("stop", "🚌 Shuttle Stop"), ("police", "👮 UCPD")]:
+        for dist, point in index.nearest(lat, lon, k=1, kind=kind):
+            st.write(f"{label}: **{point['name']}** ({dist:.0f} m away)")
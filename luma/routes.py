@@ -0,0 +1,247 @@
+# Safe-walking route planner over the safety points.
+#
+# Nodes are UCPD, every shuttle stop and every blue light phone. Each node is
+# linked to its nearest neighbours (plus the shortest links that join up any
+# clusters left apart, plus any paths from data/walkways.geojson). An edge
+# costs its length, scaled up by how far the walk along it strays from the
+# nearest blue light.
+#
+# The graph is sparse (about NEIGHBORS edges per node), so building it once
+# per dataset version stays roughly linear in time and memory, even for tens
+# of thousands of points. Routes come from Dijkstra run from the origin on
+# demand; the shortest-path trees of the last ROUTE_CACHE origins are kept,
+# so picking another destination is just following predecessor pointers.
+import heapq
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from luma.spatial_index import SpatialIndex, haversine_m, safety_points
+
+WALKWAYS_PATH = Path(__file__).resolve().parent.parent / "data" / "walkways.geojson"
+
+NEIGHBORS = 4          # straight-line links per node
+MAX_LINK_M = 700       # ...unless they are longer than this
+SNAP_M = 50            # walkway ends must be this close to a node
+EXPOSURE_SCALE_M = 100  # every 100 m away from a blue light doubles the cost
+SAMPLES = 5            # points checked along each edge
+NEAR_LIGHTS = 4        # blue lights closest to each end of an edge considered for its exposure
+ROUTE_CACHE = 64       # origins whose shortest-path trees are kept
+MAX_NODES = 30_000     # larger datasets get no route planner (seconds of build per dataset edit)
+
+
+def walkways_version(path=WALKWAYS_PATH):
+    # Cache key for the optional walkway file (None when there isn't one)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def load_walkways(path=WALKWAYS_PATH):
+    # GeoJSON LineStrings -> list of [(lat, lon), ...] paths
+    path = Path(path)
+    if not path.exists():
+        return []
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    paths = []
+    for feature in doc.get("features", []):
+        geom = feature.get("geometry") or {}
+        if geom.get("type") == "LineString" and len(geom["coordinates"]) >= 2:
+            paths.append([(lat, lon) for lon, lat in geom["coordinates"]])
+    return paths
+
+
+def path_length_m(path):
+    lats, lons = np.array(path, dtype=np.float64).T
+    return float(haversine_m(lats[:-1], lons[:-1], lats[1:], lons[1:]).sum())
+
+
+class RoutePlanner:
+    def __init__(self, points, blue_lights, walkways=()):
+        self.points = list(points)
+        self.index = SpatialIndex(self.points)
+        self._node_of = {id(p): i for i, p in enumerate(self.points)}
+        n = len(self.points)
+        self._locs = np.array([p["loc"] for p in self.points], dtype=np.float64).reshape(-1, 2)
+        locs = [tuple(loc) for loc in self._locs.tolist()]
+
+        # 1. Edges: k nearest neighbours, links joining stray clusters, walkway paths
+        edges = {}  # (i, j) with i < j -> [(lat, lon), ...]
+        near_m, near = self.index.nearest_many(self._locs[:, 0], self._locs[:, 1], k=NEIGHBORS + 1)
+        for i, (row_m, row) in enumerate(zip(near_m.tolist(), near.tolist())):
+            for d, j in [(d, j) for d, j in zip(row_m, row) if j not in (i, -1)][:NEIGHBORS]:
+                if d <= MAX_LINK_M:
+                    self._add_edge(edges, i, j, [locs[i], locs[j]])
+        for i, j in self._joining_links(edges):
+            self._add_edge(edges, i, j, [locs[i], locs[j]])
+        for path in walkways:
+            (d0, a), (d1, b) = self.index.nearest(*path[0])[0], self.index.nearest(*path[-1])[0]
+            i, j = self._node_of[id(a)], self._node_of[id(b)]
+            if d0 <= SNAP_M and d1 <= SNAP_M and i != j:
+                self._add_edge(edges, i, j, [a["loc"], *path, b["loc"]], replace=True)
+        self._edges = edges
+
+        # 2. Edge costs: length x (1 + average distance from a blue light / scale)
+        pairs = list(edges)
+        samples, meters = self._samples(pairs)
+        cost = meters * (1 + self._exposure_m(pairs, samples, blue_lights) / EXPOSURE_SCALE_M)
+        self._adj = [[] for _ in range(n)]  # i -> [(j, cost, meters), ...]
+        for (i, j), c, m in zip(pairs, cost.tolist(), meters.tolist()):
+            self._adj[i].append((j, c, m))
+            self._adj[j].append((i, c, m))
+
+        self._trees = OrderedDict()  # origin -> (cost, meters, prev), most recent last
+        self._trees_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.points)
+
+    def node(self, point):
+        return self._node_of[id(point)]
+
+    def route(self, a, b):
+        # Node indices from a to b (inclusive), or [] if b can't be reached
+        prev = self._tree(a)[2]
+        if a != b and prev[b] < 0:
+            return []
+        nodes = [b]
+        while b != a:
+            b = prev[b]
+            nodes.append(b)
+        return nodes[::-1]
+
+    def length_m(self, a, b):
+        # Walking distance along the safest route from a to b (inf if unreachable)
+        return self._tree(a)[1][b]
+
+    def geometry(self, nodes):
+        # [(lat, lon), ...] to draw, following walkway paths where there are any
+        if len(nodes) == 1:
+            return [self.points[nodes[0]]["loc"]]
+        coords = []
+        for i, j in zip(nodes, nodes[1:]):
+            path = self._edges[(min(i, j), max(i, j))]
+            path = path if i < j else path[::-1]
+            coords.extend(path if not coords else path[1:])
+        return coords
+
+    # --- internals ---
+    def _tree(self, source):
+        # Dijkstra from source to every node: (cost, meters, prev) lists
+        with self._trees_lock:
+            tree = self._trees.get(source)
+            if tree is not None:
+                self._trees.move_to_end(source)
+                return tree
+        n = len(self.points)
+        cost, meters, prev = [math.inf] * n, [math.inf] * n, [-1] * n
+        cost[source] = meters[source] = 0.0
+        heap = [(0.0, source)]
+        adj = self._adj
+        while heap:
+            c, i = heapq.heappop(heap)
+            if c > cost[i]:
+                continue
+            for j, w, m in adj[i]:
+                if c + w < cost[j]:
+                    cost[j], meters[j], prev[j] = c + w, meters[i] + m, i
+                    heapq.heappush(heap, (c + w, j))
+        tree = (cost, meters, prev)
+        with self._trees_lock:
+            self._trees[source] = tree
+            while len(self._trees) > ROUTE_CACHE:
+                self._trees.popitem(last=False)
+        return tree
+
+    @staticmethod
+    def _add_edge(edges, i, j, path, replace=False):
+        if i > j:
+            i, j, path = j, i, path[::-1]
+        if replace or (i, j) not in edges:
+            edges[(i, j)] = path
+
+    def _joining_links(self, edges):
+        # While the neighbour links leave separate clusters, join the smallest
+        # one to the closest node outside it (the link a minimum spanning tree
+        # would use). One distance row per node, never an n x n matrix.
+        n = len(self.points)
+        parent = list(range(n))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in edges:
+            parent[find(i)] = find(j)
+        roots = np.array([find(i) for i in range(n)], dtype=np.int64)
+        links = []
+        while True:
+            labels, sizes = np.unique(roots, return_counts=True)
+            if len(labels) <= 1:
+                return links
+            members = np.flatnonzero(roots == labels[np.argmin(sizes)])
+            outside = np.flatnonzero(roots != roots[members[0]])
+            best = (math.inf, -1, -1)
+            for i in members:
+                d = haversine_m(self._locs[i, 0], self._locs[i, 1], self._locs[outside, 0], self._locs[outside, 1])
+                k = int(np.argmin(d))
+                if d[k] < best[0]:
+                    best = (d[k], int(i), int(outside[k]))
+            _, i, j = best
+            links.append((i, j))
+            roots[roots == roots[i]] = roots[j]
+
+    def _samples(self, pairs):
+        # SAMPLES evenly spaced (lat, lon) points along every edge, shape
+        # (edges, SAMPLES, 2), and each edge's length in meters. Straight
+        # links are done in one go, walkway paths one by one.
+        locs = self._locs
+        ends = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        a, b = locs[ends[:, 0]], locs[ends[:, 1]]
+        t = np.linspace(0, 1, SAMPLES)[None, :, None]
+        samples = a[:, None, :] + (b - a)[:, None, :] * t
+        meters = haversine_m(a[:, 0], a[:, 1], b[:, 0], b[:, 1])
+        for e, pair in enumerate(pairs):
+            path = self._edges[pair]
+            if len(path) > 2:
+                pts = np.array(path, dtype=np.float64)
+                seg = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(pts, axis=0).T))])
+                ts = np.linspace(0, seg[-1], SAMPLES)
+                samples[e] = np.stack([np.interp(ts, seg, pts[:, 0]), np.interp(ts, seg, pts[:, 1])], axis=1)
+                meters[e] = path_length_m(path)
+        return samples, meters
+
+    def _exposure_m(self, pairs, samples, blue_lights):
+        # Mean distance to the nearest blue light over each edge's samples.
+        # Only the NEAR_LIGHTS lights closest to either end are candidates,
+        # which keeps this linear in the number of edges.
+        if not len(blue_lights) or not pairs:
+            return np.zeros(len(pairs))
+        lights = SpatialIndex(blue_lights)
+        _, near = lights.nearest_many(self._locs[:, 0], self._locs[:, 1], k=min(NEAR_LIGHTS, len(lights)))
+        ends = np.array(pairs, dtype=np.int64)
+        candidates = np.concatenate([near[ends[:, 0]], near[ends[:, 1]]], axis=1)
+        out = np.empty(len(pairs))
+        step = 4096  # bounds the temporaries below
+        for lo in range(0, len(pairs), step):
+            s, c = samples[lo:lo + step], candidates[lo:lo + step]
+            d = haversine_m(s[:, :, 0, None], s[:, :, 1, None], lights.lats[c][:, None, :], lights.lons[c][:, None, :])
+            out[lo:lo + step] = d.min(axis=2).mean(axis=1)
+        return out
+
+
+def build_route_planner(data, walkways_path=WALKWAYS_PATH):
+    # None when the dataset is too big to build the graph on a request thread
+    points = safety_points(data)
+    if len(points) > MAX_NODES:
+        return None
+    return RoutePlanner(points, data.blue_lights, load_walkways(walkways_path))
@@ -0,0 +1,99 @@
+# Safety-point dataset shown on the Berkeley Blue Lights page.
+#
+# The UCPD pin, shuttle stops (schedule data from pages 3 and 4 of the shuttle
+# PDF), blue light phones and the closure notice live in
+# data/safety_points.geojson so operations staff can edit them without a
+# redeploy. The file is parsed once into an immutable SafetyDataset and only
+# re-read when its mtime/size changes; a content hash becomes `version`, which
+# every downstream cache (map, index, timetable) is keyed on. A broken or
+# half-saved edit is logged and the last good dataset keeps being served.
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "safety_points.geojson"
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SafetyDataset:
+    version: str
+    ucpd: MappingProxyType
+    stops: tuple
+    blue_lights: tuple
+    schedules: MappingProxyType
+    closure_notice: str
+
+
+def parse_dataset(raw):
+    # GeoJSON bytes -> SafetyDataset
+    doc = json.loads(raw)
+    schedules = doc.get("schedules", {})
+    ucpd, stops, blue_lights = None, [], []
+    for feature in doc["features"]:
+        props = dict(feature["properties"])
+        lon, lat = feature["geometry"]["coordinates"]
+        props["loc"] = (lat, lon)
+        kind = props.get("kind")
+        if kind == "police":
+            ucpd = MappingProxyType(props)
+        elif kind == "stop":
+            props["sched"] = schedules[props["route"]]
+            stops.append(MappingProxyType(props))
+        elif kind == "blue_light":
+            blue_lights.append(MappingProxyType(props))
+        else:
+            raise ValueError(f"Unknown safety point kind: {kind!r}")
+    if ucpd is None:
+        raise ValueError("Dataset has no police (UCPD) point")
+    digest = hashlib.sha1(raw).hexdigest()[:10]
+    return SafetyDataset(
+        version=f"{doc.get('version', '0')}-{digest}",
+        ucpd=ucpd,
+        stops=tuple(stops),
+        blue_lights=tuple(blue_lights),
+        schedules=MappingProxyType(dict(schedules)),
+        closure_notice=doc.get("closure_notice", ""),
+    )
+
+
+_lock = threading.Lock()
+_loaded = {}  # path -> (mtime_ns, size, dataset)
+
+
+def load_dataset(path=DATA_PATH):
+    # Returns the shared dataset, re-reading the file only after it changed
+    path = Path(path)
+    cached = _loaded.get(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        if cached is None:
+            raise
+        return cached[2]  # mid-save (editor replaced the file): keep the last good one
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    with _lock:
+        cached = _loaded.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        try:
+            dataset = parse_dataset(path.read_bytes())
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            if cached is None:
+                raise  # nothing good to fall back to yet
+            # Remember the bad version too, so it isn't re-parsed on every rerun
+            log.error("safety dataset %s is invalid, keeping version %s: %r", path, cached[2].version, exc)
+            _loaded[path] = (stat.st_mtime_ns, stat.st_size, cached[2])
+            return cached[2]
+        # Touched but unchanged file: keep the old object so caches stay warm
+        if cached and cached[2].version == dataset.version:
+            dataset = cached[2]
+        _loaded[path] = (stat.st_mtime_ns, stat.st_size, dataset)
+        return dataset
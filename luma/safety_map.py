@@ -0,0 +1,184 @@
+# Builds the folium map for the Berkeley Blue Lights page.
+#
+# The base map doesn't depend on the user, so app.py builds it once per
+# dataset version (st.cache_resource) and every session renders the same
+# object. Markers and routes are small per-session overlays on top of it.
+import threading
+
+import folium
+from jinja2 import Template
+
+from luma.tile_cache import ATTRIBUTION
+
+# st_folium re-renders the map it is given, which mutates folium's internal
+# figure; sessions sharing the cached map take turns through this lock.
+RENDER_LOCK = threading.Lock()
+
+CENTER = (37.8715, -122.2590)
+ZOOM_START = 15
+
+
+class PrerenderedMap(folium.Map):
+    # The static layers never change after build_map(), so every later
+    # render() (st_folium does one per rerun) reuses the first result.
+    _rendered = False
+
+    def render(self, **kwargs):
+        if not self._rendered:
+            super().render(**kwargs)
+            self._rendered = True
+
+
+def route_layer(coords, tooltip=None):
+    # Per-session overlay, passed to st_folium(feature_group_to_add=...) so the
+    # shared base map (and its component key) stays the same
+    layer = folium.FeatureGroup(name="Safest route")
+    folium.PolyLine(coords, color="#4da3ff", weight=6, opacity=0.9, tooltip=tooltip).add_to(layer)
+    for loc in (coords[0], coords[-1]):
+        folium.CircleMarker(loc, radius=6, color="white", fill=True, fill_color="#4da3ff").add_to(layer)
+    return layer
+
+
+def detach_layer(m, layer):
+    # st_folium attaches overlays to the map it draws them on; take them off
+    # the shared map again so the next session's base script is unchanged
+    m._children.pop(layer.get_name(), None)
+
+
+def build_map(data, tiles_url=None, zoom_range=None):
+    # Base map only: tiles and view. The markers are a per-session overlay
+    # built from the visible viewport (see marker_layer), so the browser
+    # never downloads points it can't see.
+    if tiles_url:
+        # Local tiles only exist for the prefetched zoom levels
+        min_zoom, max_zoom = zoom_range or (0, 18)
+        m = PrerenderedMap(location=CENTER, zoom_start=min(max(ZOOM_START, min_zoom), max_zoom),
+                           tiles=tiles_url, attr=ATTRIBUTION, min_zoom=min_zoom, max_zoom=max_zoom)
+    else:
+        m = PrerenderedMap(
+            location=CENTER,
+            zoom_start=ZOOM_START,
+            tiles="CartoDB dark_matter"
+        )
+
+    # Render once up front so the first visitor doesn't pay for it
+    m.get_root().render()
+    return m
+
+
+def point_marker(point):
+    # Tooltip only; the details are rendered by the page when it's tapped
+    if point["kind"] == "police":
+        return folium.Marker(point["loc"], tooltip="Police Station",
+                             icon=folium.Icon(color="red", icon="shield", prefix="fa"))
+    if point["kind"] == "stop":
+        icon_color = "orange" if point["num"].startswith("N") else "purple"
+        return folium.Marker(point["loc"], tooltip=f"{point['num']} {point['name']}",
+                             icon=folium.Icon(color=icon_color, icon="bus", prefix="fa"))
+    return folium.CircleMarker(
+        location=point["loc"],
+        radius=8,
+        tooltip=f"Blue Light Phone: {point['name']}",
+        color="blue",
+        fill=True,
+        fill_color="blue",
+        bubbling_mouse_events=False,  # a tap on the phone isn't also a map tap
+    )
+
+
+def cluster_marker(cluster):
+    size = 30 + min(24, 6 * len(str(cluster.count)))
+    return folium.Marker(
+        (cluster.lat, cluster.lon),
+        tooltip=f"{cluster.count} safety points, zoom in to see them",
+        icon=folium.DivIcon(
+            html=(
+                f"<div style='width:{size}px;height:{size}px;line-height:{size}px;border-radius:50%;"
+                "background:rgba(77,163,255,0.75);border:2px solid #fff;color:#fff;"
+                f"font-weight:bold;text-align:center'>{cluster.count}</div>"
+            ),
+            icon_size=(size, size),
+            icon_anchor=(size // 2, size // 2),
+        ),
+    )
+
+
+def marker_layer(index, view):
+    # Markers (and cluster bubbles) for one viewport, see luma/viewport.py
+    from luma.viewport import visible
+    singles, clusters = visible(index, view)
+    layer = folium.FeatureGroup(name="Safety points")
+    for i in singles:
+        point_marker(index.points[i]).add_to(layer)
+    for cluster in clusters:
+        cluster_marker(cluster).add_to(layer)
+    return layer
+
+
+ROUTE_COLORS = {"north": "orange", "south": "purple"}
+
+
+class ShuttleFeed(folium.MacroElement):
+    # Client-side half of luma/shuttle_sim.py: polls the feed endpoint and
+    # moves this layer's bus markers in the browser. The script never
+    # changes, so st_folium doesn't re-send it; only the feed's small deltas
+    # travel every tick.
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            const layer = {{ this._parent.get_name() }};
+            const loc = window.parent.location;
+            const base = {{ this.feed_url|tojson }} || `${loc.protocol}//${loc.hostname}:{{ this.port }}`;
+            const colors = {{ this.colors|tojson }};
+            const markers = {}, etas = {};
+            let version = -1;
+            const tip = v => `${v.route[0].toUpperCase()}${v.route.slice(1)} Loop bus, next stop ${v.next_stop}` +
+                (etas[v.next_stop] != null ? ` in ~${etas[v.next_stop]} min` : "") +
+                (v.source === "avl" ? "" : " (scheduled position)");
+            const icon = route => L.divIcon({
+                className: "", iconSize: [22, 22], iconAnchor: [11, 11],
+                html: `<div style="width:22px;height:22px;line-height:22px;border-radius:50%;` +
+                      `background:${colors[route] || "gray"};border:2px solid #fff;text-align:center;font-size:13px">🚌</div>`,
+            });
+            async function poll() {
+                try {
+                    const feed = await (await fetch(`${base}/shuttles?since=${version}`)).json();
+                    if (feed.full) {
+                        for (const id in markers) { layer.removeLayer(markers[id].marker); delete markers[id]; }
+                    }
+                    for (const id of feed.removed) {
+                        if (markers[id]) { layer.removeLayer(markers[id].marker); delete markers[id]; }
+                    }
+                    Object.assign(etas, feed.etas);
+                    for (const [id, v] of Object.entries(feed.vehicles)) {
+                        if (markers[id]) markers[id].marker.setLatLng([v.lat, v.lon]);
+                        else markers[id] = {marker: L.marker([v.lat, v.lon], {icon: icon(v.route)}).bindTooltip("").addTo(layer)};
+                        markers[id].vehicle = v;
+                    }
+                    for (const id in markers) markers[id].marker.setTooltipContent(tip(markers[id].vehicle));
+                    version = feed.version;
+                } catch (e) {}
+            }
+            // st_folium re-evaluates overlays when another one changes: one poller per map
+            clearInterval(window.lumaShuttlePoller);
+            window.lumaShuttlePoller = setInterval(poll, {{ this.interval_ms }});
+            poll();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, feed_url, port, interval_ms):
+        super().__init__()
+        self._name = "ShuttleFeed"
+        self.feed_url = feed_url
+        self.port = port
+        self.interval_ms = interval_ms
+        self.colors = ROUTE_COLORS
+
+
+def shuttle_layer():
+    # Live shuttles overlay; identical on every rerun
+    from luma.shuttle_sim import SHUTTLE_PORT, TICK_S, feed_url
+    layer = folium.FeatureGroup(name="Shuttles")
+    ShuttleFeed(feed_url(), SHUTTLE_PORT, TICK_S * 1000).add_to(layer)
+    return layer
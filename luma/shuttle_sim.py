@@ -0,0 +1,291 @@
+# Live Night Shuttle positions and ETAs.
+#
+# Each loop (North, South) is the ordered stop sequence from the dataset,
+# closed back to its first stop. A bus that left at departure d reaches each
+# stop at d + its offset (luma.timetable.stop_offsets: the published offset,
+# else one estimated from the distance along the loop, so the ETAs here are
+# live estimates, not the timetable) and is interpolated between stops; when
+# a local AVL feed file has fresh positions for a route, those replace the
+# schedule for that route. One simulator per process advances in TICK_S
+# steps: the first caller after a tick boundary computes the new state and
+# what changed since the previous one, everyone else reuses it.
+#
+# The map doesn't rerun to move the buses: its shuttle overlay
+# (safety_map.shuttle_layer) polls the feed endpoint below, gets only the
+# vehicles and ETAs that changed since the version it has, and moves its
+# markers in the browser. Each tick's JSON is encoded once, so a poll costs
+# the same whether one or a thousand maps are open.
+#
+#   LUMA_SHUTTLE_PORT=8768  port of the feed endpoint (GET /shuttles?since=N)
+#   LUMA_SHUTTLE_URL=...    public URL of that endpoint, when it sits behind a proxy
+#                           (see luma.sidecar; Codespaces is detected on its own)
+#   LUMA_AVL_FEED=path      JSON feed standing in for real AVL data (default
+#                           .luma/avl_feed.json), rewritten by whatever polls it:
+#   {"vehicles": [{"id": "N-1", "route": "north", "lat": .., "lon": .., "t": <epoch s>}]}
+#   Reports missing a field are skipped; an unreadable file keeps the last
+#   good reports, like a bad dataset edit does (luma.safety_data).
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from luma.sidecar import QuietHandler, forwarded_url, start_server
+from luma.spatial_index import METERS_PER_DEG_LAT
+from luma.storage import STATE_DIR
+from luma.timetable import (
+    BERKELEY_TZ, loop_distances, loop_minutes, parse_schedule, route_stops, service_minute, stop_offsets,
+)
+
+log = logging.getLogger(__name__)
+
+TICK_S = 5
+AVL_PATH = Path(os.environ.get("LUMA_AVL_FEED", STATE_DIR / "avl_feed.json"))
+AVL_STALE_S = 120  # older vehicle reports are ignored
+SHUTTLE_PORT = int(os.environ.get("LUMA_SHUTTLE_PORT", "8768"))
+
+
+def service_now(now=None):
+    # Fractional service minutes (see luma.timetable) for an epoch time
+    when = datetime.fromtimestamp(time.time() if now is None else now, BERKELEY_TZ)
+    return service_minute(when) + when.second / 60 + when.microsecond / 60e6
+
+
+class Vehicle(NamedTuple):
+    vehicle_id: str
+    route: str
+    lat: float
+    lon: float
+    next_stop: str
+    source: str  # "schedule" or "avl"
+
+
+class Loop:
+    def __init__(self, route, stops, departures, offsets):
+        self.route = route
+        self.stop_ids = [s["num"] for s in stops]
+        self.departures = np.asarray(departures, dtype=np.float64)
+        minutes = loop_minutes(self.departures)
+        pts = np.array([s["loc"] for s in stops] + [stops[0]["loc"]], dtype=np.float64)
+        self.lats, self.lons = pts[:, 0], pts[:, 1]
+        self.cum = loop_distances([s["loc"] for s in stops])  # meters along the loop
+        # Minutes into a run at each stop, and back at the first one
+        self.times = np.maximum.accumulate(np.array([offsets[num] for num in self.stop_ids] + [minutes], dtype=np.float64))
+        self.minutes = float(self.times[-1])
+
+    def position(self, tau):
+        # (lat, lon) `tau` minutes into a run
+        dist = np.interp(tau, self.times, self.cum)
+        return float(np.interp(dist, self.cum, self.lats)), float(np.interp(dist, self.cum, self.lons))
+
+    def next_stop(self, tau):
+        i = int(np.searchsorted(self.times[:-1], tau, side="right"))
+        return self.stop_ids[i % len(self.stop_ids)]
+
+    def scheduled(self, t):
+        # (vehicle id, minutes into its run) for every run on the road at t
+        start = np.searchsorted(self.departures, t - self.minutes, side="right")
+        stop = np.searchsorted(self.departures, t, side="right")
+        return [(f"{self.route}-{int(d)}", t - d) for d in self.departures[start:stop]]
+
+    def snap(self, lat, lon):
+        # Minutes into a run of the closest point on the loop to (lat, lon)
+        cos = math.cos(math.radians(lat))
+        xs, ys = self.lons * cos * METERS_PER_DEG_LAT, self.lats * METERS_PER_DEG_LAT
+        px, py = lon * cos * METERS_PER_DEG_LAT, lat * METERS_PER_DEG_LAT
+        dx, dy = np.diff(xs), np.diff(ys)
+        seg2 = np.maximum(dx * dx + dy * dy, 1e-9)
+        u = np.clip(((px - xs[:-1]) * dx + (py - ys[:-1]) * dy) / seg2, 0, 1)
+        d2 = (xs[:-1] + u * dx - px) ** 2 + (ys[:-1] + u * dy - py) ** 2
+        i = int(np.argmin(d2))
+        return float(self.times[i] + u[i] * (self.times[i + 1] - self.times[i]))
+
+    def etas(self, t, taus):
+        # Minutes until the next bus at every stop: the nearest bus still
+        # before it on its run, else the next departure from the first stop
+        offsets = self.times[:-1]
+        best = np.full(len(offsets), np.inf)
+        if taus:
+            ahead = offsets[None, :] - np.asarray(taus)[:, None]
+            best = np.where(ahead >= 0, ahead, np.inf).min(axis=0)
+        upcoming = self.departures[self.departures > t]
+        if len(upcoming):
+            best = np.minimum(best, upcoming[0] - t + offsets)
+        return best
+
+
+class Tick(NamedTuple):
+    version: int
+    prev_version: int         # the tick `moved`/`removed`/`changed_etas` are relative to (None: first)
+    at: float                 # epoch seconds
+    vehicles: dict            # vehicle_id -> Vehicle
+    etas: dict                # stop num -> whole minutes (None once service is over)
+    moved: frozenset          # vehicle ids added or moved since prev_version
+    removed: frozenset        # vehicle ids gone since prev_version
+    changed_etas: dict        # stop num -> minutes, only what changed since prev_version
+
+
+class ShuttleSimulator:
+    def __init__(self, data, avl_path=AVL_PATH, tick_s=TICK_S, clock=time.time):
+        offsets = stop_offsets(data)
+        self.loops = {
+            route: Loop(route, stops, parse_schedule(data.schedules[route]), offsets)
+            for route, stops in route_stops(data).items()
+        }
+        self.avl_path = Path(avl_path)
+        self.tick_s = tick_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tick = None
+        self._avl = (None, [])  # (mtime_ns, vehicles)
+        self._feeds = {}        # (tick version, kind) -> encoded JSON
+
+    def tick(self):
+        # The current state; only the first caller after a tick boundary pays
+        now = self._clock()
+        version = int(now // self.tick_s)
+        current = self._tick
+        if current is not None and current.version == version:
+            return current
+        with self._lock:
+            if self._tick is None or self._tick.version != version:
+                self._tick = self._advance(version, now, self._tick)
+                self._feeds.clear()
+            return self._tick
+
+    def feed(self, since=None):
+        # JSON for a client holding version `since`: nothing new, the last
+        # tick's changes, or (too old / first call) everything
+        tick = self.tick()
+        if since == tick.version:
+            kind = "none"
+        elif tick.prev_version is not None and since == tick.prev_version:
+            kind = "delta"
+        else:
+            kind = "full"
+        with self._lock:
+            body = self._feeds.get((tick.version, kind))
+            if body is None:
+                body = self._feeds[(tick.version, kind)] = json.dumps(_feed_body(tick, kind)).encode()
+        return body
+
+    # --- internals ---
+    def _advance(self, version, now, prev):
+        t = service_now(now)
+        live = self._avl_vehicles(now)
+        vehicles, etas = {}, {}
+        for route, loop in self.loops.items():
+            runs = live.get(route) or loop.scheduled(t)
+            source = "avl" if route in live else "schedule"
+            for vehicle_id, tau in runs:
+                lat, lon = loop.position(tau)
+                vehicles[vehicle_id] = Vehicle(vehicle_id, route, lat, lon, loop.next_stop(tau), source)
+            for num, eta in zip(loop.stop_ids, loop.etas(t, [tau for _, tau in runs])):
+                etas[num] = round(float(eta)) if math.isfinite(eta) else None
+
+        old_vehicles = prev.vehicles if prev else {}
+        old_etas = prev.etas if prev else {}
+        return Tick(
+            version=version,
+            prev_version=prev.version if prev else None,
+            at=now,
+            vehicles=vehicles,
+            etas=etas,
+            moved=frozenset(vid for vid, v in vehicles.items() if old_vehicles.get(vid) != v),
+            removed=frozenset(old_vehicles.keys() - vehicles.keys()),
+            changed_etas={num: eta for num, eta in etas.items() if old_etas.get(num, -1) != eta},
+        )
+
+    def _avl_vehicles(self, now):
+        # route -> [(vehicle id, minutes into the run)] from the feed file
+        try:
+            stat = os.stat(self.avl_path)
+        except FileNotFoundError:
+            return {}
+        if self._avl[0] != stat.st_mtime_ns:
+            try:
+                reports = parse_avl(json.loads(self.avl_path.read_text(encoding="utf-8")), self.loops)
+            except (OSError, ValueError) as exc:
+                # Half-written or malformed file: keep the last good reports
+                # (they go stale on their own) until it is rewritten
+                log.error("AVL feed %s is invalid, keeping the last good reports: %r", self.avl_path, exc)
+                reports = self._avl[1]
+            self._avl = (stat.st_mtime_ns, reports)
+        live = {}
+        for vehicle_id, route, lat, lon, t in self._avl[1]:
+            if now - t <= AVL_STALE_S:
+                loop = self.loops[route]
+                live.setdefault(route, []).append((vehicle_id, loop.snap(lat, lon)))
+        return live
+
+
+def parse_avl(doc, loops):
+    # [(id, route, lat, lon, t)] for the well-formed reports of known routes;
+    # ValueError if the document itself isn't {"vehicles": [...]}
+    if not isinstance(doc, dict) or not isinstance(doc.get("vehicles", []), list):
+        raise ValueError("expected {\"vehicles\": [...]}")
+    reports = []
+    for report in doc.get("vehicles", []):
+        try:
+            lat, lon, t = (float(report[key]) for key in ("lat", "lon", "t"))
+            vehicle_id, route = str(report["id"]), report["route"]
+        except (KeyError, TypeError, ValueError):
+            log.warning("skipping malformed AVL report %.200r", report)
+            continue
+        if isinstance(route, str) and route in loops and all(map(math.isfinite, (lat, lon, t))):
+            reports.append((vehicle_id, route, lat, lon, t))
+    return reports
+
+
+def _feed_body(tick, kind):
+    if kind == "none":
+        vehicles, removed, etas = {}, [], {}
+    elif kind == "delta":
+        vehicles = {vid: tick.vehicles[vid] for vid in tick.moved}
+        removed, etas = sorted(tick.removed), tick.changed_etas
+    else:
+        vehicles, removed, etas = tick.vehicles, [], tick.etas
+    return {
+        "version": tick.version,
+        "full": kind == "full",
+        "vehicles": {vid: v._asdict() for vid, v in vehicles.items()},
+        "removed": removed,
+        "etas": etas,
+    }
+
+
+def build_shuttle_simulator(data):
+    return ShuttleSimulator(data)
+
+
+# --- feed endpoint: GET /shuttles?since=<version> ---
+class FeedHandler(QuietHandler):
+    server_version = "luma-shuttles"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        simulator = self.server.simulator
+        if parts.path != "/shuttles" or simulator is None:
+            return self.reply_json(404, {"error": "no shuttle feed"}, headers=[("Cache-Control", "no-store")])
+        try:
+            since = int(parse_qs(parts.query).get("since", ["-1"])[0])
+        except ValueError:
+            since = None
+        self.reply(200, simulator.feed(since), headers=[("Cache-Control", "no-store")])
+
+
+def start_feed_server(host="0.0.0.0", port=SHUTTLE_PORT):
+    # Set `.simulator` on the server to publish
+    return start_server(FeedHandler, port, "luma-shuttles", host, simulator=None)
+
+
+def feed_url():
+    # Base URL the map polls; "" means same host as the app, SHUTTLE_PORT
+    return os.environ.get("LUMA_SHUTTLE_URL") or forwarded_url(SHUTTLE_PORT) or ""
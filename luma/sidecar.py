@@ -0,0 +1,81 @@
+# Small HTTP endpoints that run next to Streamlit (GPS ingest, shuttle feed,
+# map tiles, static assets, metrics).
+#
+# Each one is a QuietHandler subclass served by start_server() from a daemon
+# thread. Whatever the handler needs (the recorder, the tile store, ...) is
+# set as an attribute on the server and read back as self.server.<name>.
+#
+# The browser talks to most of them directly. By default the page reaches
+# them on the host name it loaded the app from, at the endpoint's own port.
+# In a GitHub Codespace each forwarded port gets its own
+# https://<codespace>-<port>.<domain> host instead, so that's used when the
+# Codespaces variables are set. Anywhere else behind a proxy, set the
+# endpoint's LUMA_*_URL variable.
+import json
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger(__name__)
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    # CORS-enabled replies (pages on another origin call these endpoints) and
+    # no access log: the endpoints are hit per ping / poll / tile, and the
+    # metrics already count that traffic
+    cors = True
+    cors_methods = "GET"
+
+    def reply(self, code, body=b"", content_type="application/json", headers=()):
+        self.send_response(code)
+        if self.cors:
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Access-Control-Allow-Methods", self.cors_methods)
+            self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        if code not in (204, 304):
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        for key, value in headers:
+            self.send_header(key, value)
+        self.end_headers()
+        if body and code not in (204, 304):
+            self.wfile.write(body)
+
+    def reply_json(self, code, obj, headers=()):
+        self.reply(code, json.dumps(obj).encode(), headers=headers)
+
+    def do_OPTIONS(self):
+        self.reply(204)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(handler, port, host="0.0.0.0", **attrs):
+    # Bound but not yet serving; raises OSError if the port is taken
+    server = ThreadingHTTPServer((host, port), handler)
+    for name, value in attrs.items():
+        setattr(server, name, value)
+    return server
+
+
+def start_server(handler, port, name, host="0.0.0.0", **attrs):
+    # Serves from a daemon thread. None if the port is taken, which usually
+    # means another app process (or a standalone `serve`) already runs it.
+    try:
+        server = make_server(handler, port, host, **attrs)
+    except OSError as exc:
+        log.info("%s: port %s not available (%s), not starting it here", name, port, exc)
+        return None
+    threading.Thread(target=server.serve_forever, name=name, daemon=True).start()
+    return server
+
+
+def forwarded_url(port):
+    # Codespaces URL of a forwarded port, None outside a Codespace
+    name = os.environ.get("CODESPACE_NAME")
+    domain = os.environ.get("GITHUB_CODESPACES_PORT_FORWARDING_DOMAIN")
+    if not (name and domain):
+        return None
+    return f"https://{name}-{port}.{domain}"
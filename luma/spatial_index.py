@@ -0,0 +1,174 @@
+# Spatial index over every safety point (UCPD, shuttle stops, blue light phones).
+#
+# Points are bucketed into a fixed lat/lon grid. A query only computes
+# (vectorized) haversine distances for the cells around the query point,
+# growing ring by ring until nothing further out can be closer.
+import math
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEG_LAT = math.pi * EARTH_RADIUS_M / 180
+
+
+def haversine_m(lat, lon, lats, lons):
+    # Distance in meters from one point to arrays of points
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def safety_points(data):
+    # Flattens the dataset into one list of {"kind", "name", "loc", ...} points
+    return [data.ucpd, *data.stops, *data.blue_lights]
+
+
+class SpatialIndex:
+    def __init__(self, points, cell_deg=0.005):
+        self.points = list(points)
+        self.cell_deg = cell_deg
+        locs = np.array([p["loc"] for p in self.points], dtype=np.float64).reshape(-1, 2)
+        self.lats = locs[:, 0]
+        self.lons = locs[:, 1]
+        self.kinds = np.array([p["kind"] for p in self.points])
+        self._index_of = {id(p): i for i, p in enumerate(self.points)}
+
+        self._order, self._cells = self._bucket(cell_deg)
+        if self.points:
+            cx = np.floor(self.lats / cell_deg).astype(np.int64)
+            cy = np.floor(self.lons / cell_deg).astype(np.int64)
+            self._bbox = (int(cx.min()), int(cx.max()), int(cy.min()), int(cy.max()))
+
+    def __len__(self):
+        return len(self.points)
+
+    def nearest(self, lat, lon, k=1, kind=None):
+        # k closest points as [(distance_m, point), ...], nearest first
+        if k <= 0 or not self.points:
+            return []
+        cx, cy = int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+        # Anything outside ring r is at least this far away
+        cell_m = self.cell_deg * METERS_PER_DEG_LAT * min(1.0, math.cos(math.radians(lat)))
+        x0, x1, y0, y1 = self._bbox
+        # Skip the empty rings between a far-away query and the data, and
+        # stop once the ring covers every occupied cell
+        ring = max(0, x0 - cx, cx - x1, y0 - cy, cy - y1)
+        last_ring = max(abs(cx - x0), abs(cx - x1), abs(cy - y0), abs(cy - y1))
+        found_idx, found_dist = [], []
+        while True:
+            idx = self._ring_indices(cx, cy, ring, kind)
+            if len(idx):
+                found_idx.append(idx)
+                found_dist.append(haversine_m(lat, lon, self.lats[idx], self.lons[idx]))
+            n_found = sum(len(i) for i in found_idx)
+            if n_found >= k:
+                dist = np.concatenate(found_dist)
+                if np.partition(dist, k - 1)[k - 1] <= ring * cell_m:
+                    break
+            if ring >= last_ring:
+                break
+            ring += 1
+        if not found_idx:
+            return []
+        idx = np.concatenate(found_idx)
+        dist = np.concatenate(found_dist)
+        top = np.argsort(dist, kind="stable")[:k]
+        return [(float(dist[i]), self.points[idx[i]]) for i in top]
+
+    def nearest_many(self, lats, lons, k=1):
+        # k closest points to each of many query points at once, as (meters,
+        # indices) arrays of shape (queries, k), nearest first (padded with
+        # inf / -1 when there are fewer than k points). Queries are handled a
+        # grid cell at a time against the 3x3 cells around it; the few whose
+        # k-th neighbour may lie further out fall back to nearest().
+        lats, lons = np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+        dist = np.full((len(lats), k), np.inf)
+        idx = np.full((len(lats), k), -1, dtype=np.int64)
+        if not self.points or not len(lats) or k <= 0:
+            return dist, idx
+        # Dense data: a finer grid, so a 3x3 block holds a few dozen points
+        cell_deg, order, cells = self.cell_deg, self._order, self._cells
+        split = round(math.sqrt(len(self.points) / len(cells) / (4 * k)))
+        if split > 1:
+            cell_deg = self.cell_deg / split
+            order, cells = self._bucket(cell_deg)
+        cx = np.floor(lats / cell_deg).astype(np.int64)
+        cy = np.floor(lons / cell_deg).astype(np.int64)
+        queries = np.lexsort((cy, cx))
+        cuts = np.flatnonzero((np.diff(cx[queries]) != 0) | (np.diff(cy[queries]) != 0)) + 1
+        for group in np.split(queries, cuts):
+            x, y = int(cx[group[0]]), int(cy[group[0]])
+            slices = [cells[(x + dx, y + dy)] for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (x + dx, y + dy) in cells]
+            if not slices:
+                continue
+            cand = np.concatenate([order[lo:hi] for lo, hi in slices])
+            for rows in np.array_split(group, -(-len(group) * len(cand) // 1_000_000)):  # bounded temporaries
+                d = haversine_m(lats[rows, None], lons[rows, None], self.lats[cand][None, :], self.lons[cand][None, :])
+                top = np.argpartition(d, k - 1, axis=1)[:, :k] if len(cand) > k else np.broadcast_to(np.arange(len(cand)), d.shape)
+                top = np.take_along_axis(top, np.argsort(np.take_along_axis(d, top, axis=1), axis=1, kind="stable"), axis=1)
+                dist[rows, :top.shape[1]] = np.take_along_axis(d, top, axis=1)
+                idx[rows, :top.shape[1]] = cand[top]
+        # Only what lies inside the 3x3 block is guaranteed to be the closest
+        cell_m = cell_deg * METERS_PER_DEG_LAT * np.minimum(1.0, np.cos(np.radians(lats)))
+        kth = min(k, len(self.points)) - 1
+        for q in np.flatnonzero(~(dist[:, kth] <= cell_m)):
+            found = self.nearest(lats[q], lons[q], k=k)
+            dist[q, :len(found)] = [d for d, _ in found]
+            idx[q, :len(found)] = [self._index_of[id(p)] for _, p in found]
+        return dist, idx
+
+    def within(self, lat, lon, radius_m, kind=None):
+        # Every point within radius_m, nearest first
+        if not self.points:
+            return []
+        cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+        dlat = radius_m / METERS_PER_DEG_LAT
+        dlon = dlat / cos_lat
+        x0, x1 = int(math.floor((lat - dlat) / self.cell_deg)), int(math.floor((lat + dlat) / self.cell_deg))
+        y0, y1 = int(math.floor((lon - dlon) / self.cell_deg)), int(math.floor((lon + dlon) / self.cell_deg))
+        slices = [self._cells[(x, y)] for x in range(x0, x1 + 1) for y in range(y0, y1 + 1) if (x, y) in self._cells]
+        if not slices:
+            return []
+        idx = self._filter(np.concatenate([self._order[lo:hi] for lo, hi in slices]), kind)
+        dist = haversine_m(lat, lon, self.lats[idx], self.lons[idx])
+        keep = np.flatnonzero(dist <= radius_m)
+        keep = keep[np.argsort(dist[keep], kind="stable")]
+        return [(float(dist[i]), self.points[idx[i]]) for i in keep]
+
+    def in_bbox(self, south, west, north, east, kind=None):
+        # Indices of every point inside the box (one vectorized pass, fine
+        # for tens of thousands of points)
+        mask = (self.lats >= south) & (self.lats <= north) & (self.lons >= west) & (self.lons <= east)
+        return self._filter(np.flatnonzero(mask), kind)
+
+    # --- internals ---
+    def _bucket(self, cell_deg):
+        # Point indices sorted by grid cell, and cell -> (start, end) slice
+        cx = np.floor(self.lats / cell_deg).astype(np.int64)
+        cy = np.floor(self.lons / cell_deg).astype(np.int64)
+        order = np.lexsort((cy, cx))
+        cells = {}
+        if len(order):
+            keys = np.stack([cx[order], cy[order]], axis=1)
+            starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            bounds = np.concatenate([[0], starts, [len(order)]])
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                cells[(int(keys[lo, 0]), int(keys[lo, 1]))] = (int(lo), int(hi))
+        return order, cells
+
+    def _ring_indices(self, cx, cy, ring, kind):
+        if ring == 0:
+            cells = [(cx, cy)]
+        else:
+            cells = [(cx + dx, cy + dy) for dx in range(-ring, ring + 1) for dy in (-ring, ring)]
+            cells += [(cx + dx, cy + dy) for dx in (-ring, ring) for dy in range(-ring + 1, ring)]
+        slices = [self._cells[c] for c in cells if c in self._cells]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return self._filter(np.concatenate([self._order[lo:hi] for lo, hi in slices]), kind)
+
+    def _filter(self, idx, kind):
+        if kind is None:
+            return idx
+        return idx[self.kinds[idx] == kind]
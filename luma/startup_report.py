@@ -0,0 +1,101 @@
+# Startup-time report: what each page costs to import on a cold start.
+#
+#   python -m luma.startup_report [--runs 3]
+#
+# For every page in app.py, collects the modules its script imports (also the
+# ones imported lazily inside luma.resources getters it calls) and times them
+# with `python -X importtime` in a fresh interpreter that has already loaded
+# streamlit and app.py's own imports, i.e. the extra cost paid the first time
+# someone opens that page. The first row is app.py itself (paid at startup).
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "app.py"
+MARKER = "--luma-page-imports--"
+
+
+def page_scripts(app=APP):
+    # (title, path) for every st.Page("views/...", title=...) in app.py
+    pages = []
+    for node in ast.walk(ast.parse(app.read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Call) and getattr(node.func, "attr", "") == "Page" and node.args:
+            title = next((kw.value.value for kw in node.keywords if kw.arg == "title"), None)
+            path = node.args[0].value
+            pages.append((title or Path(path).stem, ROOT / path))
+    return pages
+
+
+def imported_modules(path):
+    # Every module a file imports, in order, including imports inside functions
+    modules = []
+    for node in ast.walk(ast.parse(Path(path).read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def lazy_modules(page_path):
+    # luma.resources getters import their heavy modules on first call
+    resources = ast.parse((ROOT / "luma" / "resources.py").read_text(encoding="utf-8"))
+    getters = {}
+    for fn in resources.body:
+        if isinstance(fn, ast.FunctionDef):
+            getters[fn.name] = [n.module for n in ast.walk(fn) if isinstance(n, ast.ImportFrom) and n.module]
+    source = Path(page_path).read_text(encoding="utf-8")
+    used = [name for name in getters if re.search(rf"\b{name}\(", source)]
+    # get_timer_engine() also pulls in the outbox and the trail recorder
+    if "get_timer_engine" in used:
+        used += ["get_alert_outbox", "get_trail_recorder"]
+    return [m for name in used for m in getters[name]]
+
+
+def measure(modules, preload=("streamlit",)):
+    # Microseconds spent importing `modules` after `preload` is already loaded
+    code = "".join(f"import {m}\n" for m in preload)
+    code += f"import sys; sys.stderr.write({MARKER!r} + '\\n')\n"
+    code += "".join(f"import {m}\n" for m in modules)
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    lines = result.stderr.split(MARKER, 1)[1].splitlines()
+    total, per_module = 0, {}
+    for line in lines:
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)", line)
+        if match and not match.group(3):  # top-level imports only (not nested)
+            total += int(match.group(2))
+            per_module[match.group(4)] = int(match.group(2))
+    return total, per_module
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page import cost report")
+    parser.add_argument("--runs", type=int, default=3, help="best of N fresh interpreters")
+    args = parser.parse_args()
+
+    app_modules = [m for m in dict.fromkeys(imported_modules(APP) + lazy_modules(APP)) if m != "streamlit"]
+    rows = [("app.py (startup)", app_modules, ["streamlit"])]
+    for title, path in page_scripts():
+        modules = [m for m in imported_modules(path) + lazy_modules(path) if m not in app_modules]
+        rows.append((title, modules, ["streamlit", *app_modules]))
+
+    print(f"{'page':<24} {'import ms':>10}  heaviest modules (ms)")
+    for title, modules, preload in rows:
+        runs = [measure(modules, preload) for _ in range(args.runs)]
+        total, per_module = min(runs, key=lambda r: r[0])
+        heaviest = sorted(per_module.items(), key=lambda kv: -kv[1])[:3]
+        detail = ", ".join(f"{name} {us / 1000:.1f}" for name, us in heaviest if us >= 100)
+        print(f"{title:<24} {total / 1000:>10.1f}  {detail}")
+
+
+if __name__ == "__main__":
+    main()
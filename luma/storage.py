@@ -0,0 +1,221 @@
+# Persistent contact + walk-state store.
+#
+# SQLite in WAL mode: readers borrow a connection from a small pool and never
+# block the writer. Writes from every session go through one queue and a
+# writer thread that commits whatever has piled up in a single transaction
+# (group commit), so a busy night costs one fsync per batch, not per click.
+# Pages keep a read-through copy in st.session_state and only hit the
+# database when a session starts.
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from luma.timer_engine import ENDED
+
+STATE_DIR = Path(os.environ.get("LUMA_STATE_DIR", Path(__file__).resolve().parent.parent / ".luma"))
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    primary_contact TEXT,
+    timer_active INTEGER NOT NULL DEFAULT 0,
+    emergency_triggered INTEGER NOT NULL DEFAULT 0,
+    walk_id TEXT
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    contact_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_by_user ON contacts (user_id, position);
+CREATE TABLE IF NOT EXISTS trail_points (
+    walk_id TEXT NOT NULL,
+    t REAL NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    accuracy REAL
+);
+CREATE INDEX IF NOT EXISTS trail_by_walk ON trail_points (walk_id, t);
+CREATE TABLE IF NOT EXISTS walks (
+    walk_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    contact TEXT NOT NULL,
+    contact_phone TEXT NOT NULL,
+    interval REAL NOT NULL,
+    reaction REAL NOT NULL,
+    phase TEXT NOT NULL,
+    window_start REAL NOT NULL,
+    deadline REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS walks_by_phase ON walks (phase);
+"""
+
+USER_FIELDS = ("primary_contact", "timer_active", "emergency_triggered", "walk_id")
+# Everything needed to re-arm a timer_engine.Walk in another process
+WALK_FIELDS = ("walk_id", "user_id", "contact", "contact_phone", "interval", "reaction", "phase", "window_start", "deadline")
+
+
+def _connect(path):
+    db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+class ConnectionPool:
+    def __init__(self, path, size=4):
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(_connect(path))
+
+    @contextmanager
+    def connection(self):
+        db = self._idle.get()
+        try:
+            yield db
+        finally:
+            self._idle.put(db)
+
+
+class SafetyStore:
+    def __init__(self, path=STATE_DIR / "luma.db", pool_size=4, max_batch=1000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_batch = max_batch
+        self._writes = queue.Queue()
+        writer_db = _connect(self.path)
+        writer_db.executescript(SCHEMA)
+        writer_db.commit()
+        self._pool = ConnectionPool(self.path, pool_size)
+        self._writer = threading.Thread(target=self._run_writer, args=(writer_db,), name="luma-store", daemon=True)
+        self._writer.start()
+
+    # --- reads (pooled, indexed) ---
+    def load_user(self, user_id):
+        with self._pool.connection() as db:
+            row = db.execute(
+                f"SELECT {', '.join(USER_FIELDS)} FROM users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        user = dict(zip(USER_FIELDS, row))
+        user["timer_active"] = bool(user["timer_active"])
+        user["emergency_triggered"] = bool(user["emergency_triggered"])
+        return user
+
+    def load_contacts(self, user_id):
+        with self._pool.connection() as db:
+            rows = db.execute(
+                "SELECT contact_id, name, phone FROM contacts WHERE user_id = ? ORDER BY position", (user_id,)
+            ).fetchall()
+        return [{"id": cid, "name": name, "phone": phone} for cid, name, phone in rows]
+
+    def load_trail(self, walk_id):
+        with self._pool.connection() as db:
+            return db.execute(
+                "SELECT t, lat, lon, accuracy FROM trail_points WHERE walk_id = ? ORDER BY t", (walk_id,)
+            ).fetchall()
+
+    def load_walk(self, walk_id):
+        with self._pool.connection() as db:
+            row = db.execute(f"SELECT {', '.join(WALK_FIELDS)} FROM walks WHERE walk_id = ?", (walk_id,)).fetchone()
+        return dict(zip(WALK_FIELDS, row)) if row else None
+
+    def load_walks(self):
+        # Every walk that hasn't ended, for re-arming after a restart
+        with self._pool.connection() as db:
+            rows = db.execute(f"SELECT {', '.join(WALK_FIELDS)} FROM walks WHERE phase != ?", (ENDED,)).fetchall()
+        return [dict(zip(WALK_FIELDS, row)) for row in rows]
+
+    # --- writes (queued, group-committed) ---
+    def save_user(self, user_id, **fields):
+        # Upserts only the given columns, e.g. save_user(uid, timer_active=True)
+        cols = [c for c in USER_FIELDS if c in fields]
+        if not cols:
+            return
+        sql = (
+            f"INSERT INTO users (user_id, {', '.join(cols)}) VALUES (?{', ?' * len(cols)}) "
+            f"ON CONFLICT(user_id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in cols)}"
+        )
+        self._writes.put((sql, (user_id, *[fields[c] for c in cols])))
+
+    def save_walk(self, walk):
+        # TimerEngine.on_change listener: upserts the walk's current window
+        # (never bringing back a walk another replica has ended)
+        self._writes.put((
+            f"INSERT INTO walks ({', '.join(WALK_FIELDS)}) VALUES (?{', ?' * (len(WALK_FIELDS) - 1)}) "
+            f"ON CONFLICT(walk_id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in WALK_FIELDS[1:])} "
+            "WHERE walks.phase != ?",
+            (*[getattr(walk, f) for f in WALK_FIELDS], ENDED),
+        ))
+
+    def end_walk(self, walk_id):
+        # TimerEngine.on_drop listener; the row stays behind as a tombstone so
+        # other replicas stop their copy too
+        self._writes.put(("UPDATE walks SET phase = ? WHERE walk_id = ?", (ENDED, walk_id)))
+
+    def add_contact(self, user_id, name, phone):
+        # Ids are made here so callers don't wait for the write to land
+        contact = {"id": uuid.uuid4().hex, "name": name, "phone": phone}
+        self._writes.put((
+            "INSERT INTO contacts (contact_id, user_id, name, phone, position) VALUES (?, ?, ?, ?, ?)",
+            (contact["id"], user_id, name, phone, time.time_ns()),
+        ))
+        return contact
+
+    def delete_contact(self, user_id, contact_id):
+        self._writes.put(("DELETE FROM contacts WHERE contact_id = ? AND user_id = ?", (contact_id, user_id)))
+
+    def add_trail_points(self, rows):
+        # rows of (walk_id, t, lat, lon, accuracy); one queued op for the lot
+        self._writes.put(("INSERT INTO trail_points VALUES (?, ?, ?, ?, ?)", list(rows)))
+
+    def flush(self, timeout=10.0):
+        # Waits until every write queued so far is committed
+        done = threading.Event()
+        self._writes.put(done)
+        return done.wait(timeout)
+
+    def _run_writer(self, db):
+        while True:
+            batch = [self._writes.get()]
+            while len(batch) < self._max_batch:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            waiters = [op for op in batch if isinstance(op, threading.Event)]
+            ops = [op for op in batch if not isinstance(op, threading.Event)]
+            if ops:
+                try:
+                    with db:  # one transaction for the whole batch
+                        for sql, params in ops:
+                            self._execute(db, sql, params)
+                except sqlite3.Error:
+                    # One bad write shouldn't sink the rest of the batch
+                    for sql, params in ops:
+                        try:
+                            with db:
+                                self._execute(db, sql, params)
+                        except sqlite3.Error as exc:
+                            log.error("dropped write (%s): %s %r", exc, sql, params)
+            for done in waiters:
+                done.set()
+
+    @staticmethod
+    def _execute(db, sql, params):
+        # A list of parameter tuples is a bulk insert
+        if isinstance(params, list):
+            db.executemany(sql, params)
+        else:
+            db.execute(sql, params)
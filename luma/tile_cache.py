@@ -0,0 +1,244 @@
+# Offline map tiles for the Blue Lights page.
+#
+# Tiles for the campus bounding box are prefetched once into an MBTiles file
+# (SQLite, TMS row order) and served by a tiny local HTTP endpoint with ETag /
+# Cache-Control headers, so the map paints from disk even on bad Wi-Fi or
+# with no internet at all.
+#
+#   python -m luma.tile_cache prefetch            # campus bbox, zoom 13-18
+#   python -m luma.tile_cache serve --port 8765   # standalone tile server
+#
+# A prefetch retries each tile a few times and skips the ones that still
+# fail; only a run that got every tile writes the MBTiles minzoom/maxzoom
+# metadata. Until then (or if it was interrupted) the map keeps using
+# CartoDB; rerunning prefetch only downloads what is missing.
+#
+# app.py starts the same server in a background thread once a prefetch has
+# completed and points the folium map at it, on the host name the browser used
+# to reach the app (behind an HTTPS proxy, route the tile server through it
+# too and set LUMA_TILE_URL). The map's zoom is limited to what was prefetched.
+import argparse
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+
+from luma.sidecar import QuietHandler, forwarded_url, make_server, start_server
+from luma.storage import STATE_DIR
+
+MBTILES_PATH = STATE_DIR / "campus_tiles.mbtiles"
+UPSTREAM_URL = "https://{s}.basemaps.cartocdn.com/dark_all/{z}/{x}/{y}.png"
+ATTRIBUTION = "&copy; OpenStreetMap contributors &copy; CARTO"
+
+# Berkeley campus + the shuttle loops: (south, west, north, east)
+CAMPUS_BBOX = (37.860, -122.275, 37.882, -122.240)
+DEFAULT_ZOOMS = range(13, 19)
+
+TILE_PORT = int(os.environ.get("LUMA_TILE_PORT", "8765"))
+CACHE_MAX_AGE = 7 * 24 * 3600
+FETCH_ATTEMPTS = 3  # per tile, with a short backoff in between
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS tiles (
+    zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB,
+    PRIMARY KEY (zoom_level, tile_column, tile_row)
+);
+"""
+
+
+def tile_range(bbox, zoom):
+    # Inclusive x/y (XYZ scheme) ranges covering bbox at one zoom level
+    south, west, north, east = bbox
+    n = 2 ** zoom
+
+    def tile_xy(lat, lon):
+        x = int((lon + 180.0) / 360.0 * n)
+        y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+        return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+    x0, y0 = tile_xy(north, west)
+    x1, y1 = tile_xy(south, east)
+    return range(x0, x1 + 1), range(y0, y1 + 1)
+
+
+class TileStore:
+    def __init__(self, path=MBTILES_PATH):
+        self.path = path
+        self._local = threading.local()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._db() as db:
+            db.executescript(SCHEMA)
+            db.execute("INSERT OR IGNORE INTO metadata VALUES ('name', 'Luma campus'), ('format', 'png')")
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            self._local.db = db
+        return db
+
+    def get(self, z, x, y):
+        # XYZ in, TMS row flip for MBTiles
+        row = self._db().execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (z, x, (2 ** z - 1) - y),
+        ).fetchone()
+        return row[0] if row else None
+
+    def mark_complete(self, bbox, zooms):
+        # Standard MBTiles metadata, written only once every tile is in
+        south, west, north, east = bbox
+        with self._db() as db:
+            db.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?)", [
+                ("minzoom", str(min(zooms))), ("maxzoom", str(max(zooms))),
+                ("bounds", f"{west},{south},{east},{north}"),
+            ])
+
+    def has(self, z, x, y):
+        return self.get(z, x, y) is not None
+
+    def put_many(self, tiles):
+        with self._db() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)",
+                [(z, x, (2 ** z - 1) - y, data) for z, x, y, data in tiles],
+            )
+
+
+def prefetched_zooms(path=MBTILES_PATH):
+    # (min, max) zoom of the last prefetch that completed, None if none did.
+    # Opens the file read-only, so asking never creates it.
+    try:
+        db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            meta = dict(db.execute("SELECT name, value FROM metadata WHERE name IN ('minzoom', 'maxzoom')"))
+        finally:
+            db.close()
+    except sqlite3.Error:  # no file yet, or not an MBTiles file
+        return None
+    if "minzoom" not in meta or "maxzoom" not in meta:
+        return None
+    return int(meta["minzoom"]), int(meta["maxzoom"])
+
+
+def prefetch(store, bbox=CAMPUS_BBOX, zooms=DEFAULT_ZOOMS, url=UPSTREAM_URL, workers=8):
+    # Downloads every missing tile in bbox/zooms; returns (fetched, skipped,
+    # failed). One bad tile doesn't stop the run, but the file is only marked
+    # complete when nothing failed.
+    wanted = [
+        (z, x, y)
+        for z in zooms
+        for xs, ys in [tile_range(bbox, z)]
+        for x in xs
+        for y in ys
+        if not store.has(z, x, y)
+    ]
+    total = sum(len(xs) * len(ys) for z in zooms for xs, ys in [tile_range(bbox, z)])
+
+    def fetch(zxy):
+        z, x, y = zxy
+        req = urllib.request.Request(
+            url.format(s="abcd"[(x + y) % 4], z=z, x=x, y=y),
+            headers={"User-Agent": "luma-tile-prefetch/1.0"},
+        )
+        for attempt in range(FETCH_ATTEMPTS):
+            try:
+                with urllib.request.urlopen(req, timeout=20) as resp:
+                    return z, x, y, resp.read()
+            except (OSError, ValueError) as exc:  # URLError/HTTPError/timeouts are OSErrors
+                if attempt + 1 == FETCH_ATTEMPTS:
+                    print(f"giving up on tile {z}/{x}/{y}: {exc}")
+                    return None
+                time.sleep(2 ** attempt)
+
+    fetched = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        batch = []
+        for tile in pool.map(fetch, wanted):
+            if tile is None:
+                continue
+            batch.append(tile)
+            if len(batch) >= 100:
+                store.put_many(batch)
+                fetched += len(batch)
+                batch = []
+        store.put_many(batch)
+        fetched += len(batch)
+    failed = len(wanted) - fetched
+    if not failed:
+        store.mark_complete(bbox, zooms)
+    return fetched, total - len(wanted), failed
+
+
+class TileHandler(QuietHandler):
+    path_re = re.compile(r"^/tiles/(\d+)/(\d+)/(\d+)\.png$")
+
+    def do_GET(self):
+        store = self.server.store
+        match = self.path_re.match(self.path.split("?", 1)[0])
+        data = store.get(*map(int, match.groups())) if match else None
+        if data is None:
+            return self.reply(404, headers=[("Cache-Control", "no-store")])
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        common = [("ETag", etag), ("Cache-Control", f"public, max-age={CACHE_MAX_AGE}")]
+        if self.headers.get("If-None-Match") == etag:
+            return self.reply(304, headers=common)
+        modified = formatdate(os.path.getmtime(store.path), usegmt=True)
+        self.reply(200, data, "image/png", headers=[("Last-Modified", modified), *common])
+
+
+def start_background_server(path=MBTILES_PATH, port=TILE_PORT):
+    # None until a prefetch has completed, or if a standalone `serve` already has the port
+    if prefetched_zooms(path) is None:
+        return None
+    return start_server(TileHandler, port, "luma-tiles", store=TileStore(path))
+
+
+def local_tile_url(hostname="localhost", prefetched=True):
+    # URL template the browser should use, or None to fall back to CartoDB
+    # (`prefetched` is False until a prefetch has completed). `hostname` is
+    # the one the browser reached the app on: "localhost" would be the
+    # student's phone itself.
+    if os.environ.get("LUMA_TILE_URL"):
+        return os.environ["LUMA_TILE_URL"]
+    if prefetched:
+        base = forwarded_url(TILE_PORT) or f"http://{hostname}:{TILE_PORT}"
+        return f"{base}/tiles/{{z}}/{{x}}/{{y}}.png"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline campus map tiles")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    pre = sub.add_parser("prefetch", help="download campus tiles into the MBTiles file")
+    pre.add_argument("--bbox", type=float, nargs=4, default=CAMPUS_BBOX, metavar=("S", "W", "N", "E"))
+    pre.add_argument("--zoom", default="13-18", help="e.g. 13-18")
+    pre.add_argument("--url", default=UPSTREAM_URL)
+    srv = sub.add_parser("serve", help="serve the MBTiles file over HTTP")
+    srv.add_argument("--port", type=int, default=TILE_PORT)
+    args = parser.parse_args()
+
+    if args.cmd == "prefetch":
+        store = TileStore()
+        lo, _, hi = args.zoom.partition("-")
+        fetched, skipped, failed = prefetch(store, tuple(args.bbox), range(int(lo), int(hi or lo) + 1), args.url)
+        print(f"fetched {fetched} tiles, {skipped} already cached -> {store.path}")
+        if failed:
+            parser.exit(1, f"{failed} tiles failed; the map keeps using CartoDB until a rerun gets them all\n")
+    else:
+        if not MBTILES_PATH.exists():
+            parser.error(f"{MBTILES_PATH} doesn't exist yet, run prefetch first")
+        store = TileStore()
+        print(f"serving {store.path} on http://localhost:{args.port}/tiles/{{z}}/{{x}}/{{y}}.png")
+        make_server(TileHandler, args.port, store=store).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# Shared check-in timer engine for protected walks.
+#
+# Every walk in the process lives in one heap keyed by its next deadline and a
+# single worker thread advances them, so no Streamlit script thread ever has to
+# sleep while a walk is running. Pages just read the stored timestamps back.
+#
+# The engine itself is in-memory; on_change/on_drop listeners write every walk
+# through to the store, and resume() re-arms saved walks after a restart or on
+# another replica. With a `loader`, a due deadline is first checked against
+# the stored walk, so a check-in or stop made on another replica wins.
+import heapq
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, replace
+
+# Walk phases
+WALKING = "walking"      # waiting for the next "Are you doing okay?" prompt
+CHECK_IN = "check_in"    # prompt is showing, response window is counting down
+EXPIRED = "expired"      # no response in time -> emergency
+ENDED = "ended"          # stored walks only: stopped, or dropped after EXPIRED_TTL
+
+# Expired walks are kept around this long so the page can still show the alert
+EXPIRED_TTL = 60 * 60
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Walk:
+    walk_id: str
+    contact: str
+    interval: float
+    reaction: float
+    contact_phone: str = ""
+    user_id: str = ""
+    phase: str = WALKING
+    window_start: float = 0.0
+    deadline: float = 0.0
+    version: int = 0
+
+    def remaining(self, now=None):
+        now = time.time() if now is None else now
+        return max(0.0, self.deadline - now)
+
+    def progress(self, now=None):
+        span = self.deadline - self.window_start
+        if span <= 0:
+            return 1.0
+        return min(1.0, 1.0 - self.remaining(now) / span)
+
+
+class TimerEngine:
+    def __init__(self, clock=time.time, loader=None):
+        self._clock = clock
+        self._loader = loader  # walk_id -> the stored Walk (or None), see advance()
+        self._walks = {}
+        self._heap = []  # (deadline, version, walk_id), stale entries skipped lazily
+        self._cond = threading.Condition()
+        self._listeners = []
+        self._change_listeners = []
+        self._drop_listeners = []
+        self._thread = None
+
+    # --- public API used by the pages ---
+    def start_walk(self, interval, reaction, contact="", contact_phone="", user_id=""):
+        walk = Walk(uuid.uuid4().hex, contact, float(interval), float(reaction), contact_phone, user_id)
+        with self._cond:
+            self._walks[walk.walk_id] = walk
+            self._open_window(walk, WALKING, walk.interval)
+            self._ensure_worker()
+            changed, listeners = replace(walk), list(self._change_listeners)
+        self._notify(listeners, changed)
+        return walk.walk_id
+
+    def check_in(self, walk_id):
+        # "I AM SAFE" -> start the next check-in window
+        with self._cond:
+            walk = self._walks.get(walk_id)
+            if walk is None or walk.phase == EXPIRED:
+                return False
+            self._open_window(walk, WALKING, walk.interval)
+            changed, listeners = replace(walk), list(self._change_listeners)
+        self._notify(listeners, changed)
+        return True
+
+    def resume(self, walk):
+        # Re-arms a walk saved by an earlier process or another replica. Its
+        # deadline may already have passed: the worker then applies the
+        # missed transitions straight away, so a walk that ran out while
+        # nobody was watching still expires into the alert path.
+        if walk.phase == ENDED:
+            return False
+        with self._cond:
+            if walk.walk_id in self._walks:
+                return False
+            walk = replace(walk, version=0)
+            self._walks[walk.walk_id] = walk
+            heapq.heappush(self._heap, (walk.deadline, walk.version, walk.walk_id))
+            self._cond.notify()
+            self._ensure_worker()
+        return True
+
+    def stop_walk(self, walk_id):
+        with self._cond:
+            stopped = self._walks.pop(walk_id, None) is not None
+            listeners = list(self._drop_listeners)
+        if stopped:
+            self._notify(listeners, walk_id)
+        return stopped
+
+    def get(self, walk_id):
+        # Returns a copy so callers never see a half-updated walk
+        with self._cond:
+            walk = self._walks.get(walk_id)
+            return replace(walk) if walk else None
+
+    def on_expire(self, callback):
+        # callback(walk) runs on the worker thread, outside the engine lock
+        with self._cond:
+            self._listeners.append(callback)
+
+    def on_change(self, callback):
+        # callback(walk) after every start, check-in and phase change
+        with self._cond:
+            self._change_listeners.append(callback)
+
+    def on_drop(self, callback):
+        # callback(walk_id) once a walk is gone for good: stopped, or expired
+        # and past EXPIRED_TTL
+        with self._cond:
+            self._drop_listeners.append(callback)
+
+    def active_count(self):
+        with self._cond:
+            return sum(1 for w in self._walks.values() if w.phase != EXPIRED)
+
+    def advance(self, now=None):
+        # Applies every transition that is due by `now`; the worker calls this,
+        # but it can also be driven by hand (tests, benchmarks).
+        now = self._clock() if now is None else now
+        expired, changed, dropped = [], [], []
+        while True:
+            with self._cond:
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    _, version, walk_id = heapq.heappop(self._heap)
+                    walk = self._walks.get(walk_id)
+                    if walk is not None and walk.version == version:
+                        due.append((walk_id, version))
+            if not due:
+                break
+            # Read outside the lock: what other replicas did to these walks
+            stored = {walk_id: self._loader(walk_id) for walk_id, _ in due} if self._loader else {}
+            with self._cond:
+                for walk_id, version in due:
+                    walk = self._walks.get(walk_id)
+                    if walk is None or walk.version != version:
+                        continue
+                    other = stored.get(walk_id)
+                    if walk.phase == EXPIRED or (other is not None and other.phase == ENDED):
+                        del self._walks[walk_id]
+                        dropped.append(walk_id)
+                    elif other is not None and other.deadline > walk.deadline:
+                        # Checked in elsewhere: follow that window instead
+                        self._open_window(walk, other.phase, other.deadline - other.window_start, start=other.window_start)
+                    elif walk.phase == WALKING:
+                        self._open_window(walk, CHECK_IN, walk.reaction, start=walk.deadline)
+                        changed.append(replace(walk))
+                    else:
+                        self._open_window(walk, EXPIRED, EXPIRED_TTL, start=walk.deadline)
+                        expired.append(replace(walk))
+                        changed.append(expired[-1])
+        with self._cond:
+            listeners = list(self._listeners)
+            change_listeners = list(self._change_listeners)
+            drop_listeners = list(self._drop_listeners)
+        for walk in changed:
+            self._notify(change_listeners, walk)
+        for walk in expired:
+            self._notify(listeners, walk)
+        for walk_id in dropped:
+            self._notify(drop_listeners, walk_id)
+        return expired
+
+    # --- internals ---
+    @staticmethod
+    def _notify(listeners, arg):
+        # One broken listener must not cost the other listeners (or the other
+        # walks in this batch) their alert
+        for callback in listeners:
+            try:
+                callback(arg)
+            except Exception:
+                log.exception("timer listener %r failed for %r", callback, arg)
+
+    def _open_window(self, walk, phase, length, start=None):
+        walk.phase = phase
+        walk.window_start = self._clock() if start is None else start
+        walk.deadline = walk.window_start + length
+        walk.version += 1
+        heapq.heappush(self._heap, (walk.deadline, walk.version, walk.walk_id))
+        self._cond.notify()
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="luma-timer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - self._clock()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+            try:
+                self.advance()
+            except Exception:
+                # Keep the worker alive: every walk in the process depends on it
+                log.exception("timer worker: advance failed")
+                time.sleep(1)
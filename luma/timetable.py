@@ -0,0 +1,130 @@
+# Night Shuttle timetable.
+#
+# The dataset's schedule strings ("7:45 PM, 8:15 PM, ...") are parsed
+# once into sorted uint16 arrays of minutes since SERVICE_DAY_START, so times
+# after midnight just keep counting (12:15 AM -> 735). Next-arrival lookups
+# are a binary search, and the batch version does every stop in one pass.
+# A stop is served its "offset" minutes after the loop's departure (0 when
+# the dataset doesn't give one, i.e. the published times). The live shuttle
+# model also needs a time for every stop, so it estimates the missing ones
+# (stop_offsets); those estimates never show up as scheduled times.
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from luma.spatial_index import haversine_m
+
+BERKELEY_TZ = ZoneInfo("America/Los_Angeles")
+SERVICE_DAY_START = 12 * 60  # noon; anything earlier belongs to the previous night
+NO_BUS = -1
+
+
+def parse_schedule(schedule):
+    # "7:45 PM, 8:15 PM, ..., 1:45 AM" -> sorted array of service minutes
+    minutes = [service_minute(datetime.strptime(t.strip(), "%I:%M %p")) for t in schedule.split(",") if t.strip()]
+    return np.array(sorted(minutes), dtype=np.uint16)
+
+
+def service_minute(when):
+    # Wall-clock time -> minutes since SERVICE_DAY_START (wraps past midnight)
+    return (when.hour * 60 + when.minute - SERVICE_DAY_START) % (24 * 60)
+
+
+def format_minute(minute):
+    # Service minutes -> "8:15 PM"
+    total = (int(minute) + SERVICE_DAY_START) % (24 * 60)
+    hour, mins = divmod(total, 60)
+    return f"{(hour - 1) % 12 + 1}:{mins:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def now_minute():
+    return service_minute(datetime.now(BERKELEY_TZ))
+
+
+def loop_minutes(departures):
+    # One run of a loop takes one headway (the next bus leaves as it gets back)
+    gaps = np.diff(np.asarray(departures, dtype=np.float64))
+    return float(np.median(gaps)) if len(gaps) else 30.0
+
+
+def loop_distances(locs):
+    # Cumulative meters along the closed loop through locs (first stop = 0,
+    # last entry = back at the first stop)
+    pts = np.array([*locs, locs[0]], dtype=np.float64)
+    legs = haversine_m(pts[:-1, 0], pts[:-1, 1], pts[1:, 0], pts[1:, 1])
+    return np.concatenate([[0.0], np.cumsum(legs)])
+
+
+def route_stops(data):
+    # route -> that loop's stops in the order the bus serves them
+    routes = {}
+    for stop in data.stops:
+        routes.setdefault(stop["route"], []).append(stop)
+    return {route: sorted(stops, key=lambda s: s["num"]) for route, stops in routes.items()}
+
+
+def stop_offsets(data):
+    # Stop num -> minutes after its loop's departure that the bus gets there,
+    # for the live model: the dataset's "offset" when given, else an
+    # estimate spreading the headway over the loop by distance
+    offsets = {}
+    for route, stops in route_stops(data).items():
+        minutes = loop_minutes(parse_schedule(data.schedules[route]))
+        cum = loop_distances([s["loc"] for s in stops])
+        for stop, meters in zip(stops, cum):
+            if "offset" in stop:
+                offsets[stop["num"]] = int(stop["offset"])
+            else:
+                offsets[stop["num"]] = int(round(meters / cum[-1] * minutes)) if cum[-1] else 0
+    return offsets
+
+
+class Timetable:
+    def __init__(self, stops, offsets=None):
+        # Stops that share a schedule string share one departures array
+        routes = {}
+        self.stop_ids = [stop["num"] for stop in stops]
+        self._stop_pos = {num: i for i, num in enumerate(self.stop_ids)}
+        self.stop_route = np.empty(len(stops), dtype=np.uint8)
+        # Minutes after the loop departure that the bus reaches each stop
+        # (the published offsets unless `offsets` overrides them)
+        offsets = offsets or {}
+        self.stop_offset = np.array(
+            [offsets.get(stop["num"], stop.get("offset", 0)) for stop in stops], dtype=np.uint16
+        )
+        for i, stop in enumerate(stops):
+            self.stop_route[i] = routes.setdefault(stop["sched"], len(routes))
+        self.routes = [parse_schedule(sched) for sched in routes]
+
+    def arrivals(self, stop):
+        # Every arrival at a stop, in service minutes
+        pos = self._stop_pos[stop]
+        return self.routes[self.stop_route[pos]] + self.stop_offset[pos]
+
+    def next_arrivals(self, stop, now=None, k=2):
+        # Next k arrivals at `stop` at or after `now` (service minutes)
+        now = now_minute() if now is None else now
+        pos = self._stop_pos[stop]
+        times = self.routes[self.stop_route[pos]]
+        start = np.searchsorted(times, now - int(self.stop_offset[pos]), side="left")
+        return (times[start:start + k] + self.stop_offset[pos]).tolist()
+
+    def next_arrivals_batch(self, now=None, k=1):
+        # (n_stops, k) array of next arrivals for every stop; NO_BUS pads the
+        # rows once the last bus of the night has gone
+        now = now_minute() if now is None else now
+        out = np.full((len(self.stop_ids), k), NO_BUS, dtype=np.int32)
+        for route, times in enumerate(self.routes):
+            rows = np.flatnonzero(self.stop_route == route)
+            offsets = self.stop_offset[rows].astype(np.int32)
+            start = np.searchsorted(times, now - offsets, side="left")
+            for j in range(k):
+                idx = start + j
+                ok = idx < len(times)
+                out[rows[ok], j] = times[idx[ok]].astype(np.int32) + offsets[ok]
+        return out
+
+
+def build_timetable(data):
+    return Timetable(data.stops)
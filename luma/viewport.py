@@ -0,0 +1,84 @@
+# Which safety points to put on the map for the part of it that is on screen.
+#
+# st_folium reports the visible bounds and zoom; only points inside them
+# (plus a margin so short pans don't show empty edges) are sent to the
+# browser. Below CLUSTER_BELOW_ZOOM, or whenever more than MAX_MARKERS would
+# be visible, points are merged on a zoom-dependent grid into count bubbles,
+# so the payload stays bounded no matter how many points the dataset has.
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+MAX_MARKERS = 200
+CLUSTER_BELOW_ZOOM = 14
+CLUSTER_PX = 64          # grid cell size on screen
+MARGIN = 0.25            # extra viewport on every side
+
+
+class Viewport(NamedTuple):
+    south: float
+    west: float
+    north: float
+    east: float
+    zoom: int
+
+
+def viewport_around(lat, lon, zoom, width_px=700, height_px=500):
+    # What a width x height map centered on (lat, lon) shows at `zoom`
+    deg_per_px = 360 / (256 * 2 ** zoom)
+    half_w = width_px / 2 * deg_per_px
+    half_h = height_px / 2 * deg_per_px * math.cos(math.radians(lat))
+    return Viewport(lat - half_h, lon - half_w, lat + half_h, lon + half_w, int(zoom))
+
+
+def viewport_from_state(state, default):
+    # st_folium's {"bounds": {...}, "zoom": ..} -> Viewport, or default
+    bounds = (state or {}).get("bounds") or {}
+    sw, ne = bounds.get("_southWest") or {}, bounds.get("_northEast") or {}
+    if None in (sw.get("lat"), sw.get("lng"), ne.get("lat"), ne.get("lng")):
+        return default
+    zoom = state.get("zoom")
+    return Viewport(sw["lat"], sw["lng"], ne["lat"], ne["lng"], int(zoom if zoom is not None else default.zoom))
+
+
+def padded(view, margin=MARGIN):
+    dlat = (view.north - view.south) * margin
+    dlon = (view.east - view.west) * margin
+    return Viewport(view.south - dlat, view.west - dlon, view.north + dlat, view.east + dlon, view.zoom)
+
+
+class Cluster(NamedTuple):
+    lat: float
+    lon: float
+    count: int
+    members: np.ndarray  # point indices
+
+
+def visible(index, view, max_markers=MAX_MARKERS):
+    # (point indices, clusters) to draw for this viewport; clusters of one
+    # point come back as plain points
+    box = padded(view)
+    idx = index.in_bbox(box.south, box.west, box.north, box.east)
+    if not len(idx) or (view.zoom >= CLUSTER_BELOW_ZOOM and len(idx) <= max_markers):
+        return idx, []
+    cell = CLUSTER_PX * 360 / (256 * 2 ** view.zoom)
+    while True:
+        # One int64 per grid cell: 1-D unique is far cheaper than axis=0
+        row = np.floor(index.lats[idx] / cell).astype(np.int64)
+        col = np.floor(index.lons[idx] / cell).astype(np.int64)
+        _, group, counts = np.unique((row << 32) ^ (col & 0xFFFFFFFF), return_inverse=True, return_counts=True)
+        if len(counts) <= max_markers:
+            break
+        cell *= 2  # still too many bubbles for this screen: coarser grid
+    group = group.ravel()
+    lats = np.bincount(group, weights=index.lats[idx]) / counts
+    lons = np.bincount(group, weights=index.lons[idx]) / counts
+    order = np.argsort(group, kind="stable")
+    members = np.split(idx[order], np.cumsum(counts)[:-1])
+    singles = [int(m[0]) for m in members if len(m) == 1]
+    clusters = [
+        Cluster(float(lats[g]), float(lons[g]), int(counts[g]), members[g])
+        for g in range(len(counts)) if counts[g] > 1
+    ]
+    return np.array(singles, dtype=np.int64), clusters
@@ -0,0 +1,79 @@
+import sqlite3
+
+from luma.alert_outbox import DELIVERED, RECORDED, SKIPPED, AlertOutbox, FileSinkTransport, SmtpTransport
+from luma.timer_engine import Walk
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+
+    def send_batch(self, alerts):
+        self.sent.extend(alerts)
+        return [(DELIVERED, "ok") for _ in alerts]
+
+
+def make_outbox(tmp_path, transport):
+    return AlertOutbox(path=tmp_path / "outbox.db", transport=transport, base_delay=0.01)
+
+
+def test_alert_carries_contact_phone_and_user(tmp_path):
+    transport = Recorder()
+    outbox = make_outbox(tmp_path, transport)
+    walk = Walk("w1", "Mom", 60, 15, contact_phone="510-555-0100", user_id="u1")
+    assert outbox.enqueue_walk(walk)
+    assert outbox.drain(timeout=5)
+    payload = transport.sent[0]["payload"]
+    assert (payload["contact_phone"], payload["user_id"], payload["contact_name"]) == ("510-555-0100", "u1", "Mom")
+    outbox.close()
+
+
+def test_dispatcher_survives_database_errors(tmp_path, monkeypatch):
+    transport = Recorder()
+    outbox = make_outbox(tmp_path, transport)
+    real_claim, calls = outbox._claim_batch, []
+
+    def flaky_claim():
+        calls.append(1)
+        if len(calls) <= 2:
+            raise sqlite3.OperationalError("database is locked")
+        return real_claim()
+
+    monkeypatch.setattr(outbox, "_claim_batch", flaky_claim)
+    outbox.enqueue_walk(Walk("w2", "Mom", 60, 15, contact_phone="510-555-0100"))
+    assert outbox.drain(timeout=5)
+    assert outbox.receipt("w2")["status"] == DELIVERED
+    outbox.close()
+
+
+def test_file_sink_is_recorded_not_delivered(tmp_path):
+    outbox = make_outbox(tmp_path, FileSinkTransport(tmp_path / "sent.jsonl"))
+    outbox.enqueue_walk(Walk("w3", "Mom", 60, 15, contact_phone="510-555-0100"))
+    assert outbox.drain(timeout=5)
+    assert outbox.receipt("w3")["status"] == RECORDED
+    outbox.close()
+
+
+def test_contact_without_phone_is_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr("smtplib.SMTP", lambda *args, **kwargs: FakeSmtp())
+    outbox = make_outbox(tmp_path, SmtpTransport())
+    outbox.enqueue_walk(Walk("w4", "Mom", 60, 15))
+    outbox.enqueue_walk(Walk("w5", "Dad", 60, 15, contact_phone="(510) 555-0101"))
+    assert outbox.drain(timeout=5)
+    assert outbox.receipt("w4")["status"] == SKIPPED
+    assert outbox.receipt("w5")["status"] == DELIVERED
+    assert FakeSmtp.sent == ["5105550101@luma.local"]
+    outbox.close()
+
+
+class FakeSmtp:
+    sent = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def send_message(self, msg):
+        FakeSmtp.sent.append(msg["To"])
@@ -0,0 +1,57 @@
+import pytest
+
+from luma.contacts import UCPD_NAME, UCPD_PHONE, ContactIndex
+from luma.intents import CLASSIFIER, FALLBACK, classify, classify_batch
+
+
+@pytest.mark.parametrize("text", [
+    "I can’t get in to my dorm",
+    "I don’t know where I am",
+    "I can‘t find my friends",
+])
+def test_curly_apostrophes_match_like_straight_ones(text):
+    straight = classify(text.replace("’", "'").replace("‘", "'"))
+    assert straight
+    assert [s.intent.name for s in classify(text)] == [s.intent.name for s in straight]
+
+
+def old_chain(text):
+    # The if/elif chain the chatbot used before the intent table
+    text = text.lower()
+    if "followed" in text:
+        return "followed"
+    elif "lost" in text or "dark" in text:
+        return "lost"
+    elif "unsafe" in text:
+        return "unsafe"
+    elif "locked out" in text:
+        return "locked_out"
+    return "general"
+
+
+@pytest.mark.parametrize("text", [
+    "I am being followed",
+    "I'm lost and I think I'm being followed",
+    "it's dark and I feel unsafe",
+    "locked out and it's getting dark",
+    "I feel unsafe, I got locked out",
+    "unsafe, lost, followed and locked out",
+    "what time is it",
+])
+def test_ranking_keeps_the_old_if_elif_order(text):
+    assert CLASSIFIER.best(text).name == old_chain(text)
+
+
+def test_classify_batch_matches_classify():
+    texts = ["I am being followed", "", "lost in the dark", "nothing to see here", "I’m locked out"]
+    assert classify_batch(texts) == [classify(text) for text in texts]
+    assert classify_batch([]) == []
+
+
+def test_fallback_calls_the_primary_contacts_phone():
+    contacts = ContactIndex([
+        {"id": "a", "name": UCPD_NAME, "phone": UCPD_PHONE},
+        {"id": "b", "name": "Mom", "phone": "(510) 555-0100"},
+    ], primary_name="Mom")
+    assert FALLBACK.link(contacts.primary) == ("📞 Call Mom", "tel:5105550100")
+    assert FALLBACK.link(None) == (f"📞 Call {UCPD_NAME}", "tel:5106423333")
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+
+from luma import routes
+from luma.routes import RoutePlanner, build_route_planner
+from luma.safety_data import load_dataset
+from luma.spatial_index import SpatialIndex
+
+
+def grid_points(rows, cols, lat=37.87, lon=-122.26, step=0.001):
+    return [
+        {"kind": "blue_light" if (r + c) % 2 else "stop", "name": f"{r},{c}", "loc": (lat + r * step, lon + c * step)}
+        for r in range(rows) for c in range(cols)
+    ]
+
+
+def test_nearest_many_matches_nearest():
+    rng = np.random.default_rng(0)
+    lats, lons = 37.86 + rng.random(3000) * 0.02, -122.27 + rng.random(3000) * 0.02
+    lats[:500] = 37.87 + rng.random(500) * 0.0005  # a dense cluster too
+    index = SpatialIndex([{"kind": "x", "name": str(i), "loc": loc} for i, loc in enumerate(zip(lats, lons))])
+    dist, idx = index.nearest_many(lats[::50], lons[::50], k=5)
+    for row, (lat, lon) in enumerate(zip(lats[::50], lons[::50])):
+        assert np.allclose(dist[row], [d for d, _ in index.nearest(lat, lon, k=5)])
+
+
+def test_routes_follow_the_graph_both_ways():
+    planner = build_route_planner(load_dataset(), walkways_path="missing.geojson")
+    n = len(planner)
+    for a, b in [(0, n - 1), (3, 17), (n - 1, 0)]:
+        nodes = planner.route(a, b)
+        assert nodes[0] == a and nodes[-1] == b
+        assert math.isclose(planner.length_m(a, b), planner.length_m(b, a))
+    assert planner.route(5, 5) == [5]
+
+
+def test_far_clusters_are_still_joined():
+    far = [{"kind": "stop", "name": "far", "loc": (37.90, -122.20)}]  # kilometres past MAX_LINK_M
+    points = grid_points(5, 5) + far
+    planner = RoutePlanner(points, [p for p in points if p["kind"] == "blue_light"])
+    assert planner.route(0, len(points) - 1)[-1] == len(points) - 1
+
+
+def test_oversized_dataset_gets_no_planner(monkeypatch):
+    monkeypatch.setattr(routes, "MAX_NODES", 10)
+    assert build_route_planner(load_dataset()) is None
@@ -0,0 +1,16 @@
+import shutil
+
+from luma.safety_data import DATA_PATH, load_dataset
+
+
+def test_bad_edit_keeps_the_last_good_dataset(tmp_path, caplog):
+    path = tmp_path / "safety_points.geojson"
+    shutil.copy(DATA_PATH, path)
+    good = load_dataset(path)
+
+    path.write_text('{"features": [', encoding="utf-8")  # half-written save
+    assert load_dataset(path) is good
+    assert "invalid" in caplog.text
+
+    shutil.copy(DATA_PATH, path)
+    assert load_dataset(path).version == good.version
@@ -0,0 +1,108 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from luma.safety_data import load_dataset
+from luma.shuttle_sim import SHUTTLE_PORT, ShuttleSimulator, feed_url
+from luma.timetable import BERKELEY_TZ, Timetable, build_timetable, parse_schedule, service_minute, stop_offsets
+
+
+def epoch_at(hour, minute, second=0):
+    return datetime.now(BERKELEY_TZ).replace(hour=hour, minute=minute, second=second, microsecond=0).timestamp()
+
+
+@pytest.fixture
+def data():
+    return load_dataset()
+
+
+def make_sim(data, tmp_path, clock):
+    return ShuttleSimulator(data, avl_path=tmp_path / "avl.json", clock=lambda: clock[0])
+
+
+@pytest.mark.parametrize("hour, minute", [(20, 1), (22, 1), (23, 47), (1, 10)])
+def test_live_etas_follow_the_stop_offsets(data, tmp_path, hour, minute):
+    clock = [epoch_at(hour, minute)]
+    tick = make_sim(data, tmp_path, clock).tick()
+    timetable = Timetable(data.stops, stop_offsets(data))
+    now = service_minute(datetime.fromtimestamp(clock[0], BERKELEY_TZ))
+    for num in timetable.stop_ids:
+        upcoming = timetable.next_arrivals(num, now, k=1)
+        if upcoming:
+            assert tick.etas[num] == upcoming[0] - now, num
+        else:
+            assert tick.etas[num] is None, num
+
+
+def test_timetable_shows_published_times_not_estimates(data):
+    timetable = build_timetable(data)
+    for stop in data.stops:
+        published = parse_schedule(data.schedules[stop["route"]]) + stop.get("offset", 0)
+        assert timetable.arrivals(stop["num"]).tolist() == published.tolist()
+
+
+def test_feed_sends_only_changes(data, tmp_path):
+    clock = [epoch_at(21, 10)]
+    sim = make_sim(data, tmp_path, clock)
+    full = json.loads(sim.feed(-1))
+    assert full["full"] and full["vehicles"]
+    assert json.loads(sim.feed(full["version"])) == {
+        "version": full["version"], "full": False, "vehicles": {}, "removed": [], "etas": {},
+    }
+    assert sim.feed(-1) is sim.feed(-1)  # encoded once per tick
+
+    clock[0] += sim.tick_s
+    delta = json.loads(sim.feed(full["version"]))
+    assert not delta["full"]
+    assert set(delta["vehicles"]) <= set(full["vehicles"])
+    assert len(delta["etas"]) < len(full["etas"])
+
+
+def test_avl_report_replaces_the_schedule(data, tmp_path):
+    clock = [epoch_at(21, 10)]
+    sim = make_sim(data, tmp_path, clock)
+    loop = sim.loops["north"]
+    lat, lon = loop.position(loop.minutes / 2)
+    (tmp_path / "avl.json").write_text(json.dumps(
+        {"vehicles": [{"id": "N-1", "route": "north", "lat": lat, "lon": lon, "t": clock[0]}]}
+    ))
+    north = [v for v in sim.tick().vehicles.values() if v.route == "north"]
+    assert [(v.vehicle_id, v.source) for v in north] == [("N-1", "avl")]
+
+
+@pytest.mark.parametrize("doc", [
+    {"vehicles": "oops"},
+    [{"id": "N-2", "route": "north"}],
+    {"vehicles": [{"id": "N-2", "route": "north", "t": 0}, "oops", {"id": "N-3", "route": ["north"], "lat": 1, "lon": 2, "t": 3}]},
+])
+def test_bad_avl_feed_keeps_the_last_good_reports(data, tmp_path, doc, caplog):
+    clock = [epoch_at(21, 10)]
+    sim = make_sim(data, tmp_path, clock)
+    feed = tmp_path / "avl.json"
+    lat, lon = sim.loops["north"].position(1.0)
+    feed.write_text(json.dumps({"vehicles": [{"id": "N-1", "route": "north", "lat": lat, "lon": lon, "t": clock[0]}]}))
+    assert [v.vehicle_id for v in sim.tick().vehicles.values() if v.route == "north"] == ["N-1"]
+
+    feed.write_text(json.dumps(doc))
+    os.utime(feed, ns=(0, feed.stat().st_mtime_ns + 1))
+    clock[0] += sim.tick_s
+    north = [v for v in sim.tick().vehicles.values() if v.route == "north"]
+    if isinstance(doc, dict) and isinstance(doc["vehicles"], list):
+        assert north and all(v.source == "schedule" for v in north)  # readable file, no usable report
+    else:
+        assert [v.vehicle_id for v in north] == ["N-1"]
+    assert json.loads(sim.feed(-1))["full"]
+    assert "AVL" in caplog.text
+
+
+def test_feed_url_follows_codespaces_port_forwarding(monkeypatch):
+    monkeypatch.delenv("LUMA_SHUTTLE_URL", raising=False)
+    monkeypatch.delenv("CODESPACE_NAME", raising=False)
+    assert feed_url() == ""
+    monkeypatch.setenv("CODESPACE_NAME", "luma-abc")
+    monkeypatch.setenv("GITHUB_CODESPACES_PORT_FORWARDING_DOMAIN", "app.github.dev")
+    assert feed_url() == f"https://luma-abc-{SHUTTLE_PORT}.app.github.dev"
+    monkeypatch.setenv("LUMA_SHUTTLE_URL", "https://luma.example/shuttles-feed")
+    assert feed_url() == "https://luma.example/shuttles-feed"
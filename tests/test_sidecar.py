@@ -0,0 +1,72 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from luma.gps_trail import start_ingest_server
+from luma.shuttle_sim import start_feed_server
+from luma.sidecar import start_server
+from luma.tile_cache import TileHandler, TileStore
+
+WALK_ID = "ab" * 16
+
+
+class FakeRecorder:
+    def __init__(self):
+        self.pings = []
+
+    def is_recording(self, walk_id):
+        return walk_id == WALK_ID
+
+    def add(self, walk_id, lat, lon, t=None, accuracy=None):
+        self.pings.append((lat, lon))
+        return True
+
+
+def call(server, path, method="GET", body=None, headers=None):
+    host, port = server.server_address[:2]
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=body, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as err:
+        return err.code, err.headers, err.read()
+
+
+@pytest.fixture
+def servers():
+    started = []
+    yield started
+    for server in started:
+        server.shutdown()
+        server.server_close()
+
+
+def test_ping_endpoint_answers_preflight_and_posts(servers):
+    recorder = FakeRecorder()
+    servers.append(server := start_ingest_server(recorder, host="127.0.0.1", port=0))
+    status, headers, _ = call(server, f"/walks/{WALK_ID}/pings", "OPTIONS")
+    assert status == 204 and headers["Access-Control-Allow-Methods"] == "POST, OPTIONS"
+    body = json.dumps([{"lat": 37.87, "lon": -122.26}]).encode()
+    status, headers, data = call(server, f"/walks/{WALK_ID}/pings", "POST", body, {"Content-Type": "application/json"})
+    assert (status, json.loads(data)) == (200, {"accepted": 1})
+    assert headers["Access-Control-Allow-Origin"] == "*"
+    assert call(server, f"/walks/{'cd' * 16}/pings", "POST", body)[0] == 404
+
+
+def test_tile_endpoint_revalidates_with_etag(servers, tmp_path):
+    store = TileStore(tmp_path / "tiles.mbtiles")
+    store.put_many([(15, 5242, 12663, b"png")])
+    servers.append(server := start_server(TileHandler, 0, "luma-tiles-test", "127.0.0.1", store=store))
+    status, headers, data = call(server, "/tiles/15/5242/12663.png")
+    assert (status, data, headers["Content-Type"]) == (200, b"png", "image/png")
+    status, _, data = call(server, "/tiles/15/5242/12663.png", headers={"If-None-Match": headers["ETag"]})
+    assert (status, data) == (304, b"")
+    assert call(server, "/tiles/15/0/0.png")[0] == 404
+
+
+def test_taken_port_gives_no_server(servers):
+    servers.append(first := start_feed_server(host="127.0.0.1", port=0))
+    assert call(first, "/shuttles")[0] == 404  # nothing published yet
+    assert start_feed_server(host="127.0.0.1", port=first.server_address[1]) is None
@@ -0,0 +1,19 @@
+from luma.storage import SafetyStore
+from luma.timer_engine import CHECK_IN, ENDED, Walk
+
+
+def test_walks_survive_a_restart_until_they_end(tmp_path):
+    store = SafetyStore(tmp_path / "luma.db")
+    walk = Walk("w1", "Mom", 60, 30, contact_phone="510-555-0100", user_id="u1",
+                phase=CHECK_IN, window_start=1000.0, deadline=1030.0)
+    store.save_walk(walk)
+    assert store.flush()
+
+    restarted = SafetyStore(tmp_path / "luma.db")
+    assert [Walk(**row) for row in restarted.load_walks()] == [walk]
+
+    restarted.end_walk("w1")
+    store.save_walk(walk)  # a late write from another replica can't revive it
+    assert restarted.flush() and store.flush()
+    assert restarted.load_walks() == []
+    assert restarted.load_walk("w1")["phase"] == ENDED
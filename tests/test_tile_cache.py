@@ -0,0 +1,51 @@
+import io
+import urllib.error
+
+from luma import tile_cache
+from luma.tile_cache import TileStore, prefetch, prefetched_zooms, start_background_server
+
+BBOX = (37.870, -122.262, 37.874, -122.256)  # a few tiles at zoom 15-16
+
+
+def fake_upstream(monkeypatch, broken=()):
+    monkeypatch.setattr(tile_cache.time, "sleep", lambda s: None)
+    calls = []
+
+    def urlopen(req, timeout):
+        calls.append(req.full_url)
+        if any(part in req.full_url for part in broken):
+            raise urllib.error.URLError("connection reset")
+        return io.BytesIO(b"png")
+
+    monkeypatch.setattr(tile_cache.urllib.request, "urlopen", urlopen)
+    return calls
+
+
+def test_failed_tile_is_retried_then_skipped_and_blocks_the_switch(tmp_path, monkeypatch):
+    path = tmp_path / "tiles.mbtiles"
+    store = TileStore(path)
+    wanted = sum(len(xs) * len(ys) for z in (15, 16) for xs, ys in [bbox_tiles(z)])
+    first_x = bbox_tiles(16)[0][0]
+    calls = fake_upstream(monkeypatch, broken=[f"/16/{first_x}/"])
+    fetched, skipped, failed = prefetch(store, BBOX, range(15, 17), url="http://tiles/{z}/{x}/{y}.png")
+    assert failed and fetched == wanted - failed and skipped == 0
+    assert len(calls) == fetched + failed * tile_cache.FETCH_ATTEMPTS
+    assert prefetched_zooms(path) is None
+    assert start_background_server(path) is None
+
+    # The rerun only asks for what's missing and marks the file complete
+    calls = fake_upstream(monkeypatch)
+    assert prefetch(store, BBOX, range(15, 17), url="http://tiles/{z}/{x}/{y}.png") == (failed, fetched, 0)
+    assert len(calls) == failed
+    assert prefetched_zooms(path) == (15, 16)
+
+
+def test_asking_for_zooms_never_creates_the_file(tmp_path):
+    path = tmp_path / "tiles.mbtiles"
+    assert prefetched_zooms(path) is None
+    assert start_background_server(path) is None
+    assert not path.exists()
+
+
+def bbox_tiles(zoom):
+    return tile_cache.tile_range(BBOX, zoom)
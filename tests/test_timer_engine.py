@@ -0,0 +1,147 @@
+from dataclasses import replace
+
+from luma.timer_engine import CHECK_IN, ENDED, EXPIRED, EXPIRED_TTL, WALKING, TimerEngine, Walk
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_engine():
+    clock = FakeClock()
+    return TimerEngine(clock=clock), clock
+
+
+def test_walk_goes_through_every_phase():
+    engine, clock = make_engine()
+    walk_id = engine.start_walk(interval=60, reaction=30, contact="Mom")
+    assert engine.get(walk_id).phase == WALKING
+
+    assert engine.advance(clock.now + 59) == []
+    assert engine.get(walk_id).phase == WALKING
+
+    engine.advance(clock.now + 60)
+    walk = engine.get(walk_id)
+    assert walk.phase == CHECK_IN
+    assert walk.deadline == clock.now + 90
+
+    expired = engine.advance(clock.now + 90)
+    assert [w.walk_id for w in expired] == [walk_id]
+    assert engine.get(walk_id).phase == EXPIRED
+    assert engine.active_count() == 0
+
+    engine.advance(clock.now + 90 + EXPIRED_TTL)
+    assert engine.get(walk_id) is None
+
+
+def test_check_in_resets_the_window():
+    engine, clock = make_engine()
+    walk_id = engine.start_walk(interval=60, reaction=30)
+    engine.advance(clock.now + 60)
+    assert engine.get(walk_id).phase == CHECK_IN
+
+    clock.now += 75
+    assert engine.check_in(walk_id)
+    walk = engine.get(walk_id)
+    assert walk.phase == WALKING
+    assert walk.window_start == clock.now
+    assert walk.deadline == clock.now + 60
+
+    # The old check-in deadline no longer fires
+    assert engine.advance(clock.now + 59) == []
+    assert engine.get(walk_id).phase == WALKING
+
+
+def test_check_in_after_expiry_is_refused():
+    engine, clock = make_engine()
+    walk_id = engine.start_walk(interval=10, reaction=10)
+    engine.advance(clock.now + 20)
+    assert not engine.check_in(walk_id)
+    assert engine.get(walk_id).phase == EXPIRED
+
+
+def test_failing_listener_does_not_lose_other_alerts():
+    engine, clock = make_engine()
+    seen = []
+
+    def broken(walk):
+        raise RuntimeError("transport down")
+
+    engine.on_expire(broken)
+    engine.on_expire(lambda walk: seen.append(walk.walk_id))
+    first = engine.start_walk(interval=10, reaction=10)
+    second = engine.start_walk(interval=10, reaction=10)
+
+    expired = engine.advance(clock.now + 20)
+    assert {w.walk_id for w in expired} == {first, second}
+    assert sorted(seen) == sorted([first, second])
+
+    # Later walks still advance
+    third = engine.start_walk(interval=10, reaction=10)
+    engine.advance(clock.now + 20)
+    assert third in seen
+
+
+def test_dropped_walks_notify_drop_listeners():
+    engine, clock = make_engine()
+    dropped = []
+    engine.on_drop(dropped.append)
+    stopped = engine.start_walk(interval=10, reaction=10)
+    abandoned = engine.start_walk(interval=10, reaction=10)
+
+    engine.stop_walk(stopped)
+    assert dropped == [stopped]
+
+    engine.advance(clock.now + 20)  # expires
+    assert dropped == [stopped]
+    engine.advance(clock.now + 20 + EXPIRED_TTL)
+    assert dropped == [stopped, abandoned]
+
+
+def test_resumed_walk_that_ran_out_expires_into_the_alert_path():
+    engine, clock = make_engine()
+    seen = []
+    engine.on_expire(lambda walk: seen.append(walk.walk_id))
+    saved = Walk("w1", "Mom", 60, 30, phase=WALKING, window_start=clock.now - 200, deadline=clock.now - 140)
+
+    assert engine.resume(saved)
+    assert not engine.resume(saved)  # already running here
+    engine.advance()
+    assert seen == ["w1"]
+    assert engine.get("w1").phase == EXPIRED
+
+
+def test_changes_are_reported_for_the_store():
+    engine, clock = make_engine()
+    changes = []
+    engine.on_change(lambda walk: changes.append(walk.phase))
+    walk_id = engine.start_walk(interval=10, reaction=10)
+    engine.check_in(walk_id)
+    engine.advance(clock.now + 20)
+    assert changes == [WALKING, WALKING, CHECK_IN, EXPIRED]
+
+
+def test_other_replicas_check_ins_and_stops_win():
+    clock = FakeClock()
+    stored = {}
+    engine = TimerEngine(clock=clock, loader=stored.get)
+    dropped = []
+    engine.on_drop(dropped.append)
+    checked_in = engine.start_walk(interval=10, reaction=10)
+    stopped = engine.start_walk(interval=10, reaction=10)
+    unsaved = engine.start_walk(interval=10, reaction=10)
+
+    # Another replica moved one walk's window on and ended the other one
+    walk = engine.get(checked_in)
+    stored[checked_in] = replace(walk, window_start=clock.now + 8, deadline=clock.now + 18)
+    stored[stopped] = replace(engine.get(stopped), phase=ENDED)
+
+    expired = engine.advance(clock.now + 20)
+    assert [w.walk_id for w in expired] == [unsaved]  # no stored copy: keep protecting it
+    assert engine.get(checked_in).phase == CHECK_IN
+    assert engine.get(checked_in).deadline == clock.now + 28
+    assert engine.get(stopped) is None and dropped == [stopped]
@@ -0,0 +1,191 @@
+# --- PAGE 3: BLUE LIGHT MAP (WITH INTERACTIVE SCHEDULES) ---
+import streamlit as st
+from streamlit_folium import st_folium
+from luma.resources import (
+    get_blue_lights_map, get_route_planner, get_safety_index, get_timetable, map_tiles, show_nearest_safe_points,
+    shuttle_simulator,
+)
+from luma.metrics import MAP_RENDER
+from luma.routes import walkways_version
+from luma.safety_data import load_dataset
+from luma.safety_map import CENTER, RENDER_LOCK, ZOOM_START, detach_layer, marker_layer, route_layer, shuttle_layer
+from luma.shuttle_sim import TICK_S
+from luma.timetable import NO_BUS, format_minute, now_minute
+from luma.viewport import viewport_around, viewport_from_state
+
+st.header("📍 Interactive Night Safety Map")
+st.write("Tap a bus stop for its next arrivals. Zoom in to see exact stop locations.")
+
+# 1. Schedule Information Section
+st.subheader("🚌 Night Shuttle Schedule Summary")
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown("<span style='color:orange'>●</span> **North Loop (N)**", unsafe_allow_html=True)
+    st.caption("7:45 PM - 2:15 AM | Every 30 mins [cite: 1]")
+with col2:
+    st.markdown("<span style='color:purple'>●</span> **South Loop (S)**", unsafe_allow_html=True)
+    st.caption("7:30 PM - 3:00 AM | Every 30 mins [cite: 1]")
+
+# Live "next bus" lookups from the parsed timetable
+data = load_dataset()
+timetable = get_timetable(data.version, data)
+shuttles = shuttle_simulator(data)
+stop_names = {stop["num"]: stop["name"] for stop in data.stops}
+now = now_minute()
+chosen_stop = st.selectbox("🕒 When is the next bus at...", options=timetable.stop_ids, format_func=lambda num: f"{num} - {stop_names[num]}")
+upcoming = timetable.next_arrivals(chosen_stop, now, k=3)
+if upcoming:
+    st.write("Next arrivals: " + ", ".join(f"**{format_minute(m)}** ({m - now} min)" for m in upcoming))
+else:
+    st.write("No more buses at this stop tonight.")
+
+
+def live_eta(minutes):
+    if minutes is None:
+        return "no more buses tonight"
+    return "due now" if minutes < 1 else f"~{minutes} min"
+
+
+# Live ETA for the chosen stop: only this line reruns on the shuttle tick
+# (the buses on the map move by themselves, see safety_map.shuttle_layer)
+@st.fragment(run_every=TICK_S)
+def live_arrival(stop):
+    tick = shuttles.tick()
+    if tick.vehicles:
+        # Estimated from where the buses are, not the published times above
+        st.caption(f"🚌 Live estimate: next bus **{live_eta(tick.etas.get(stop))}** · {len(tick.vehicles)} shuttle(s) on the road")
+
+
+live_arrival(chosen_stop)
+with st.expander("Next arrival at every stop"):
+    next_bus = timetable.next_arrivals_batch(now, k=1)[:, 0]
+    st.table([
+        {"Stop": num, "Name": stop_names[num], "Next Bus": format_minute(m) if m != NO_BUS else "—"}
+        for num, m in zip(timetable.stop_ids, next_bus)
+    ])
+st.divider()
+
+# 2. Temporary Closure Note
+st.warning(f"⚠️ **Temporary Stop Closure:** {data.closure_notice}")
+
+# 3-5. Route planner, map and tapped-point details. This is one fragment, so
+# panning/zooming the map (which reports its viewport back) only reruns this
+# part of the page, not the timetable above.
+KIND_ICONS = {"police": "👮", "stop": "🚌", "blue_light": "🔵"}
+HERE = -1
+
+
+def show_point_details(point):
+    # Rendered on demand for the tapped marker instead of an inline popup
+    with st.container(border=True):
+        if point["kind"] == "police":
+            st.markdown(f"**👮 {point['name']}**  \n{point['address']}")
+        elif point["kind"] == "stop":
+            upcoming = timetable.next_arrivals(point["num"], now, k=3)
+            times = ", ".join(f"**{format_minute(m)}**" for m in upcoming) or "no more buses tonight"
+            st.markdown(f"**🚌 Stop {point['num']}: {point['name']}**  \nNext arrivals: {times}")
+            st.caption("All arrivals: " + ", ".join(format_minute(m) for m in timetable.arrivals(point["num"])))
+        else:
+            st.markdown(f"**🔵 Blue Light Phone:** {point['name']}")
+
+
+def safest_route(planner, my_location):
+    # From/To pickers and the route summary; returns the route overlay (if any)
+    def point_label(node):
+        if node == HERE:
+            return "📌 My tapped location"
+        point = planner.points[node]
+        num = f"{point['num']} " if "num" in point else ""
+        return f"{KIND_ICONS[point['kind']]} {num}{point['name']}"
+
+    col_from, col_to = st.columns(2)
+    with col_from:
+        origins = ([HERE] if my_location else []) + list(range(len(planner)))
+        start = st.selectbox("From", origins, format_func=point_label)
+    with col_to:
+        goal = st.selectbox("To", range(len(planner)), format_func=point_label)  # UCPD first
+
+    first, lead_in = start, 0.0
+    if start == HERE:
+        # Walk to the nearest safety point first, then follow the graph
+        lead_in, point = planner.index.nearest(*my_location)[0]
+        first = planner.node(point)
+    nodes = planner.route(first, goal)
+    overlays = []
+    if len(nodes) > 1 or start == HERE:
+        coords = planner.geometry(nodes)
+        if start == HERE:
+            coords = [my_location, *coords]
+        meters = planner.length_m(first, goal) + lead_in
+        passed = sum(planner.points[i]["kind"] == "blue_light" for i in nodes)
+        st.write(f"**{meters:.0f} m** (about {max(1, round(meters / 80))} min on foot), past **{passed}** Blue Light phone(s)")
+        st.caption(" → ".join(planner.points[i]["name"] for i in nodes))
+        overlays.append(route_layer(coords, tooltip=f"Safest route: {meters:.0f} m"))
+    elif not nodes:
+        st.write("No walking route between these two points.")
+    return overlays
+
+
+@st.fragment
+def safety_map():
+    # The map's last reported state lands in st.session_state["blue_lights_map"]
+    # before this rerun starts, so everything below already uses it
+    map_state = st.session_state.get("blue_lights_map") or {}
+    if map_state.get("last_clicked"):
+        clicked = map_state["last_clicked"]
+        st.session_state.my_location = (clicked["lat"], clicked["lng"])
+    index = get_safety_index(data.version, data)
+
+    # 3. Safest walking route between any two safety points (or the tapped spot)
+    st.subheader("🛣️ Safest Walking Route")
+    st.caption("The shortest walk that stays close to Blue Light phones along the way.")
+    planner = get_route_planner(data.version, data, walkways_version())
+    if planner is None:
+        st.caption("Route planning is off: this dataset has too many safety points.")
+        overlays = []
+    else:
+        overlays = safest_route(planner, st.session_state.get("my_location"))
+
+    # 4. Render the shared, prebuilt base map with this session's overlays:
+    # only the markers inside the current viewport (clustered when zoomed
+    # out), the route and the live shuttles. The base script never changes,
+    # so pans and zooms just swap the overlays on the client; the shuttle
+    # overlay is the same script every time and moves its buses itself.
+    st.write("Tap anywhere on the map to find the closest Blue Light phone and shuttle stop. Tap a marker for details.")
+    view = viewport_from_state(map_state, viewport_around(*CENTER, ZOOM_START))
+    overlays.insert(0, marker_layer(index, view))
+    overlays.insert(1, shuttle_layer())
+    m = get_blue_lights_map(data.version, data, *map_tiles())
+    with RENDER_LOCK:
+        try:
+            with MAP_RENDER.time():
+                st_folium(m, width=700, height=500, render=False, feature_group_to_add=overlays,
+                          returned_objects=["last_clicked", "last_object_clicked", "bounds", "zoom"],
+                          key="blue_lights_map")
+        finally:
+            for layer in overlays:
+                detach_layer(m, layer)
+
+    tapped = map_state.get("last_object_clicked")
+    if tapped:
+        hits = index.nearest(tapped["lat"], tapped["lng"], k=1)
+        if hits and hits[0][0] < 1.0:
+            show_point_details(hits[0][1])
+
+    # 5. Nearest safe points to the tapped location
+    if st.session_state.get("my_location"):
+        show_nearest_safe_points(*st.session_state.my_location)
+
+
+safety_map()
+
+st.markdown("""
+### Legend
+* 🔴 **Red Shield:** UCPD Police Station
+* 🟠 **Orange Bus:** North Loop Stop (N)
+* 🟣 **Purple Bus:** South Loop Stop (S)
+* 🔵 **Blue Circle:** Blue Light Phone
+* 🔢 **Numbered Bubble:** Several points close together (zoom in)
+* 🟦 **Blue Line:** Your safest walking route
+* 🚌 **Round Bus (orange/purple):** A North/South Loop shuttle right now
+""")
@@ -0,0 +1,54 @@
+# --- PAGE 6: SAFETY CHATBOT (UPDATED) ---
+import streamlit as st
+from luma.intents import FALLBACK, IntentScore, classify
+from luma.metrics import CHATBOT_INTENTS
+from luma.resources import show_nearest_safe_points
+
+st.title("🤖 AI Safety Assistant")
+st.write("Describe your situation or select a quick option below.")
+
+# State to hold the selected scenario for immediate triggering
+if 'quick_scenario' not in st.session_state:
+    st.session_state.quick_scenario = ""
+
+# 1. Quick Select Buttons for immediate situations
+col1, col2 = st.columns(2)
+with col1:
+    if st.button("🚨 Being Followed"):
+        st.session_state.quick_scenario = "I am being followed"
+    if st.button("🔒 Locked Out/In"):
+        st.session_state.quick_scenario = "I am locked out of my dorm"
+with col2:
+    if st.button("💡 Lost at Night"):
+        st.session_state.quick_scenario = "I am lost and it is dark"
+    if st.button("😨 Feeling Unsafe"):
+        st.session_state.quick_scenario = "I feel unsafe in my current location"
+
+# 2. Text Input for custom situations (updates based on scenario selection)
+user_input = st.text_input("Or describe your situation:", value=st.session_state.quick_scenario)
+
+# 3. Action Button & Advice Logic
+# Trigger if "Get Safety Plan" is clicked OR if a quick button was clicked
+if st.button("Get Safety Plan") or st.session_state.quick_scenario:
+    # Determine the final query to act on
+    final_query = st.session_state.quick_scenario if st.session_state.quick_scenario else user_input
+
+    if final_query:
+        st.subheader("Your Action Plan")
+
+        # 4. Context-Aware Advice Generator: every matching intent, most
+        # urgent first (rules live in luma/intents.py)
+        matches = classify(final_query) or [IntentScore(FALLBACK, 0.0, ())]
+        for match in matches:
+            intent = match.intent
+            CHATBOT_INTENTS.inc(intent=intent.name)
+            getattr(st, intent.level)(intent.advice)
+            if intent.button:
+                st.link_button(*intent.link(st.session_state.contacts.primary))
+            if intent.show_nearest and st.session_state.get("my_location"):
+                show_nearest_safe_points(*st.session_state.my_location)
+    else:
+        st.error("Please describe your situation or select a quick option.")
+
+    # Reset scenario after running logic to allow new inputs
+    st.session_state.quick_scenario = ""
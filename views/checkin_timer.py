@@ -0,0 +1,138 @@
+# --- PAGE 3: CHECK-IN TIMER ---
+import streamlit as st
+from luma.alert_outbox import DELIVERED, FAILED, RECORDED, SKIPPED
+from luma.assets import stylesheet_tag
+from luma.resources import get_alert_outbox, get_assets, get_timer_engine, get_trail_recorder, get_walk, save_walk_state, share_location
+from luma.timer_engine import WALKING, EXPIRED
+
+timer_engine = get_timer_engine()
+trail_recorder = get_trail_recorder()
+
+col_title, col_toggle = st.columns([3, 1])
+with col_title:
+    st.title("⏱️ Safety Check-In")
+with col_toggle:
+    st.write("") 
+    # The 'help' parameter adds the little info button next to the toggle
+    demo_mode = st.toggle("Demo Mode", value=False, help="Sets the check-in interval to 5 seconds for testing.")
+
+# --- THE EMERGENCY ALERT SCREEN (Dark Purple Mode) ---
+if st.session_state.emergency_triggered:
+    # Keep following the walker's phone while their contact responds
+    share_location(st.session_state.walk_id)
+    # Only claim a location when the queued alert really carries one
+    alert = get_alert_outbox().payload(st.session_state.walk_id)
+    sending = "Your safety status and last known location are being sent." if alert and alert.get("last_location") else "Your safety status is being sent."
+    # Dark Purple Mode lives in a cached stylesheet (assets/alert.css)
+    st.markdown(stylesheet_tag(get_assets(), "alert"), unsafe_allow_html=True)
+    st.markdown(f"""
+        <div class="alert-box">
+            <h1 style="font-size: 40px; margin-bottom: 10px;">🌙 Luma Alert</h1>
+            <h3 style="color: #e1d5e7 !important;">Check-in Window Expired</h3>
+            <p style="font-size: 18px; margin-top: 20px;">
+                Luma is alerting <b>{st.session_state.primary_contact}</b>
+                that you may need assistance.
+            </p>
+            <p style="font-size: 14px; opacity: 0.8;">{sending}</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Delivery receipt from the alert outbox, refreshed until it settles
+    @st.fragment(run_every=2)
+    def alert_receipt():
+        receipt = get_alert_outbox().receipt(st.session_state.walk_id)
+        if receipt is None:
+            st.caption("📨 Queuing your alert...")
+        elif receipt["status"] == DELIVERED:
+            st.caption(f"✅ Alert delivered to {st.session_state.primary_contact}.")
+        elif receipt["status"] == RECORDED:
+            # File sink: fine for a demo, but nobody actually got a message
+            st.caption("📝 Alert recorded locally (test transport), no one was notified. Call 911 or UCPD directly if you need help.")
+        elif receipt["status"] == SKIPPED:
+            st.caption(f"⚠️ Luma could not reach {st.session_state.primary_contact} ({receipt['receipt']}). Call 911 or UCPD directly.")
+        elif receipt["status"] == FAILED:
+            st.caption("⚠️ Luma could not deliver your alert. Call 911 or UCPD directly.")
+        else:
+            st.caption(f"📨 Sending your alert... (attempt {receipt['attempts'] + 1})")
+
+    alert_receipt()
+
+    if st.button("✅ I'm Okay Now (Reset App)"):
+        timer_engine.stop_walk(st.session_state.walk_id)  # also drops the GPS trail
+        st.session_state.emergency_triggered = False
+        st.session_state.timer_active = False
+        save_walk_state()
+        st.rerun()
+    st.stop() 
+
+# --- NORMAL TIMER SETTINGS ---
+st.write("Luma is here to walk with you. Set your check-in window below.")
+
+col_a, col_b = st.columns(2)
+with col_a:
+    check_interval = st.selectbox("Check in every:", [1, 2, 5, 10], index=1, format_func=lambda x: f"{x} Mins")
+with col_b:
+    reaction_time = st.slider("Response window (seconds):", 5, 60, 15)
+
+if not st.session_state.timer_active:
+    if st.button("🚀 Start My Protected Walk"):
+        wait_time = 5 if demo_mode else (check_interval * 60)
+        primary = st.session_state.contacts.primary or {}
+        st.session_state.walk_id = timer_engine.start_walk(
+            wait_time, reaction_time, st.session_state.primary_contact,
+            contact_phone=primary.get("phone", ""), user_id=st.session_state.user_id,
+        )
+        st.session_state.timer_active = True
+        save_walk_state()
+        st.rerun()
+else:
+    if st.button("🏠 I'm Safely Home (Stop)"):
+        timer_engine.stop_walk(st.session_state.walk_id)  # also drops the GPS trail
+        st.session_state.timer_active = False
+        save_walk_state()
+        st.rerun()
+
+    # Location pings go straight to the trail recorder, not through reruns
+    share_location(st.session_state.walk_id)
+
+    # Timer Logic: the shared engine owns the deadlines, this fragment only
+    # redraws the countdown once a second instead of sleeping the script thread
+    @st.fragment(run_every=1)
+    def walk_status():
+        # Re-armed from the store after a restart or on another replica
+        walk = get_walk(st.session_state.walk_id)
+        if walk is None:
+            # Only once the walk has really ended (e.g. stopped from another
+            # tab); say so rather than quietly dropping the protection
+            st.warning("⚠️ This protected walk has ended and Luma is no longer watching it. Start a new walk if you're still on your way.")
+            if st.button("OK", key="walk_gone"):
+                st.session_state.timer_active = False
+                save_walk_state()
+                st.rerun()
+            return
+        if walk.phase == EXPIRED:
+            st.session_state.emergency_triggered = True
+            save_walk_state()
+            st.rerun()
+
+        if walk.phase == WALKING:
+            st.info(f"✨ **Luma is protecting you.** Next check-in in {int(walk.remaining())}s.")
+            st.progress(walk.progress())
+            trail = trail_recorder.stats(walk.walk_id)
+            if trail and trail["pings"]:
+                st.caption(f"📍 Sharing your location ({trail['kept']} points on your trail)")
+            else:
+                st.caption("📍 Waiting for your phone's location... (allow location access to share it)")
+            return
+
+        # The Check-in Prompt
+        st.markdown("<h3 style='text-align: center;'>Are you doing okay?</h3>", unsafe_allow_html=True)
+        if st.button("✅ I AM SAFE", key="checkin_btn"):
+            timer_engine.check_in(walk.walk_id)
+            st.toast("Great! Resetting for your next window...")
+            st.rerun(scope="fragment")
+
+        # Large, visible countdown numbers for the demo
+        st.markdown(f"<h1 style='text-align: center; color: #9b59b6; font-size: 80px;'>{int(walk.remaining())}</h1>", unsafe_allow_html=True)
+
+    walk_status()
@@ -0,0 +1,119 @@
+# --- PAGE 2: EMERGENCY CONTACTS (Updated with Add/Delete/Primary) ---
+import streamlit as st
+from luma.resources import get_store
+
+st.title("🚨 Emergency Contacts")
+
+col1, col2 = st.columns(2)
+with col1:
+    st.link_button("🚨 CALL 911", "tel:911")
+    st.link_button("👮 UCPD", "tel:5106423333")
+with col2:
+    st.link_button("🚶 BEARWALK", "tel:5106429255")
+    st.link_button("🚌 SHUTTLE", "tel:5106439255")
+
+st.divider()
+
+# Each contact row, the directory around them and the primary picker are
+# their own fragments, and edits happen in on_click callbacks that rerun only
+# the fragments they change (by fragment key): deleting a contact reruns its
+# row and the picker, adding one the directory and the picker, changing the
+# primary the two rows whose ⭐ moves and the picker. Never the whole app
+# (CSS, sidebar, the call buttons above).
+contacts = st.session_state.contacts
+
+
+def row_key(contact_id):
+    return f"contact_{contact_id}"
+
+
+def save_primary():
+    st.session_state.primary_contact = contacts.primary_name
+    get_store().save_user(st.session_state.user_id, primary_contact=contacts.primary_name)
+
+
+def delete_contact(contact_id):
+    was_primary = contact_id == contacts.primary_id
+    contacts.remove(contact_id)
+    get_store().delete_contact(st.session_state.user_id, contact_id)
+    rows = [row_key(contact_id)]
+    if was_primary:
+        save_primary()
+        rows.append(row_key(contacts.primary_id))  # the ⭐ falls back to UCPD
+    st.rerun([*rows, "primary_picker"])
+
+
+def add_contact():
+    name, phone = st.session_state.new_contact_name, st.session_state.new_contact_phone
+    if name and phone:
+        contacts.add(get_store().add_contact(st.session_state.user_id, name, phone))
+        st.session_state.contact_notice = ("success", f"Added {name}!")
+        st.rerun(["contact_directory", "primary_picker"])
+    else:
+        st.session_state.contact_notice = ("warning", "Please enter both a name and a phone number.")
+
+
+def set_primary():
+    old = contacts.primary_id
+    if contacts.set_primary(st.session_state.primary_choice):
+        save_primary()
+        st.session_state.primary_changed = True
+        st.rerun([row_key(old), row_key(contacts.primary_id), "primary_picker"])
+
+
+def contact_row(contact_id):
+    contact = contacts.get(contact_id)
+    if contact is None:
+        return  # just deleted
+    cols = st.columns([3, 1])
+    with cols[0]:
+        is_pri = "⭐ " if contact_id == contacts.primary_id else ""
+        st.write(f"{is_pri}**{contact['name']}** ({contact['phone']})")
+    with cols[1]:
+        if not contacts.is_protected(contact_id):
+            st.button("🗑️", key=f"del_{contact_id}", on_click=delete_contact, args=(contact_id,))
+
+
+# Manage/Delete Contacts, one fragment per row (keyed by contact id), with
+# the add form at the bottom
+@st.fragment(key="contact_directory")
+def directory():
+    st.subheader("⚙️ Manage Directory")
+    for contact_id in contacts.ids():
+        st.fragment(key=row_key(contact_id))(contact_row)(contact_id)
+
+    st.subheader("➕ Add New Contact")
+    with st.form("add_contact", clear_on_submit=True, border=False):
+        st.text_input("Name (e.g., Mom, Roommate)", key="new_contact_name")
+        st.text_input("Phone Number", key="new_contact_phone")
+        st.form_submit_button("Add to Directory", on_click=add_contact)
+    notice = st.session_state.pop("contact_notice", None)
+    if notice:
+        getattr(st, notice[0])(notice[1])
+
+
+directory()
+
+st.divider()
+
+
+# Select Primary
+@st.fragment(key="primary_picker")
+def primary_picker():
+    st.subheader("⭐ Select Primary Contact")
+    st.write(f"Luma currently alerts **⭐ {contacts.primary_name}**.")
+    ids = contacts.ids()
+    st.selectbox(
+        "Who should Luma alert?",
+        options=ids,
+        index=ids.index(contacts.primary_id) if contacts.primary_id in contacts else 0,
+        format_func=lambda cid: contacts.get(cid)["name"],
+        key="primary_choice",
+    )
+    st.button("Set as Primary", on_click=set_primary)
+    if st.session_state.pop("primary_changed", False):
+        st.balloons()
+        st.success(f"✅ {contacts.primary_name} is now Primary!")
+
+
+primary_picker()
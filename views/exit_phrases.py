@@ -0,0 +1,35 @@
+# --- PAGE 4: EXIT PHRASES ---
+import streamlit as st
+import random
+
+st.title("💬 Exit Phrase Generator")
+
+# --- FIXED SECTION ---
+phrases = [
+    "I don’t know you. Please give me space.",
+    "I’m not interested. Please stop following me.",
+    "I’d like to be left alone.",
+    "Please step back.",
+    "I feel uncomfortable. I’m going to leave.",
+    "I don’t want to talk. Have a good day.",
+    "I need to meet someone. I have to go.",
+    "I’m in a hurry.",
+    "Excuse me.",
+    "I need to go, I have an appointment."
+]
+# ----------------------
+
+if st.button("Generate"):
+    st.success(f"**Try:** \"{random.choice(phrases)}\"")
+
+# --- ADD THIS SECTION UNDER THE BUTTON ---
+st.markdown("---")
+st.markdown("#### Try these ideas:")
+st.markdown("""
+* "My roommate is locked out!"
+* "My Uber is here!"
+* "I left my stove on!"
+* "I need to meet someone at the dorms."
+* "My phone is dying, I need to go charge it."
+""")
+# ----------------------------------------
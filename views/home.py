@@ -0,0 +1,49 @@
+# --- PAGE 1: HOMEPAGE ---
+import streamlit as st
+from luma.assets import logo_tag
+from luma.resources import get_assets
+
+st.markdown("<p style='text-align: left; color: #9b59b6; font-size: 14px;'>⬆️ Click the arrow in the upper left corner to open the menu</p>", unsafe_allow_html=True)
+
+# Pre-resized, cached logo variants; the browser picks one for its pixel ratio
+assets = get_assets()
+col_left, col_logo, col_right = st.columns([1, 2, 1])
+
+with col_logo:
+    if assets and assets["logo"]:
+        st.markdown(logo_tag(assets), unsafe_allow_html=True)
+    else:
+        st.markdown("<h1 style='text-align: center; color: #9b59b6;'>🌙 LUMA</h1>", unsafe_allow_html=True)
+
+st.markdown("<h3 style='text-align: center;'>Your Radiance in the Dark ✨</h3>", unsafe_allow_html=True)
+
+# Emergency Buttons Grid
+st.error("🆘 **Quick Help Section**")
+row1_col1, row1_col2 = st.columns(2)
+row2_col1, row2_col2 = st.columns(2)
+
+with row1_col1:
+    st.link_button("🚨 CALL 911", "tel:911")
+with row1_col2:
+    st.link_button("👮 CALL UCPD", "tel:5106423333")
+with row2_col1:
+    st.link_button("🚶 BEARWALK", "tel:5106429255")
+with row2_col2:
+    st.link_button("🚌 SHUTTLE", "tel:5106439255")
+
+st.divider()
+
+st.subheader("👤 Personal Safety Setup")
+st.info(f"""
+**Current Primary Contact:** {st.session_state.primary_contact}
+
+**To update this:**
+1. Open the **Side Menu** (top-left arrow ⬆️).
+2. Select **'Emergency Contacts'**.
+3. Add, Delete, or Select a new Primary contact.
+""")
+
+st.divider()
+st.markdown("### ✨ What is Luma?")
+st.markdown("We are your light source in Berkeley, ensuring no student has to walk in the dark alone.")
+st.caption("Created with 💜 for the 2026 Women's Hackathon")